@@ -0,0 +1,47 @@
+"""PoW hash rate: re-serializing loop vs. midstate template.
+
+Run from the repository root::
+
+    python benchmarks/bench_pow.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from blockchain_demo.block import Block
+
+ATTEMPTS = 2_000
+
+
+def naive_rate(block):
+    start = time.perf_counter()
+    for nonce in range(ATTEMPTS):
+        block.header = block.header.with_nonce(nonce)
+        int(block.hash(), 16)
+    return ATTEMPTS / (time.perf_counter() - start)
+
+
+def template_rate(block):
+    start = time.perf_counter()
+    template = block.pow_template()
+    for nonce in range(ATTEMPTS):
+        int.from_bytes(template.digest(nonce), "big")
+    return ATTEMPTS / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'state keys':>10} {'naive (H/s)':>14} {'template (H/s)':>16} {'speedup':>8}")
+    for size in (10, 1_000, 10_000, 50_000):
+        state = {f"k{i}": i for i in range(size)}
+        balances = {f"{i:064x}": i for i in range(min(size, 1_000))}
+        block = Block.create_candidate("0" * 64, 1, "miner", [], state, balances)
+        block.header = block.header.with_nonce(12345)
+        assert block.pow_template().hash(12345) == block.hash()
+        naive = naive_rate(block)
+        fast = template_rate(block)
+        print(f"{size:>10} {naive:>14,.0f} {fast:>16,.0f} {fast / naive:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Block execution cost vs. state size: copy-per-tx vs. StateOverlay.
+
+Run from the repository root::
+
+    python benchmarks/bench_state_overlay.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from blockchain_demo import dsl
+from blockchain_demo.overlay import StateOverlay
+
+TXS_PER_BLOCK = 100
+SCRIPT = "let counter = counter + 1; let temp = counter - 2"
+
+
+def copy_per_tx(parent_state):
+    state = parent_state
+    for _ in range(TXS_PER_BLOCK):
+        state = dsl.execute(SCRIPT, state)
+    return state
+
+
+def overlay(parent_state):
+    state = StateOverlay(parent_state)
+    compiled = dsl.compile_script(SCRIPT)
+    for _ in range(TXS_PER_BLOCK):
+        state.begin()
+        dsl.apply(compiled, state)
+        state.commit()
+    return state.to_dict()
+
+
+def timed(fn, state, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{TXS_PER_BLOCK} txs per block")
+    print(f"{'state keys':>10} {'copy/tx (ms)':>14} {'overlay (ms)':>14} {'speedup':>8}")
+    for size in (100, 1_000, 10_000, 50_000, 100_000):
+        state = {f"k{i}": i for i in range(size)}
+        state["counter"] = 0
+        assert copy_per_tx(state) == overlay(state)
+        baseline = timed(copy_per_tx, state)
+        layered = timed(overlay, state)
+        print(f"{size:>10} {baseline * 1e3:>14.2f} {layered * 1e3:>14.2f} {baseline / layered:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,125 @@
 import json
 import hashlib
 import time
-from dataclasses import dataclass, field
-from typing import List, Dict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
+from typing import Callable, List, Dict, Mapping, Optional, Sequence
 from math import ceil
 from .wallet import verify
 from .transaction import Transaction
 from . import dsl
+from . import merkle
+from . import config
+from .overlay import StateOverlay
+from .miner import PowTemplate, MiningProgress, mine
+from .executor import execute_block
 
 
 def sha256d(data: bytes) -> str:
     return hashlib.sha256(hashlib.sha256(data).digest()).hexdigest()
 
 
-@dataclass
+def canonical_encode(data) -> bytes:
+    return json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+
+
+# Placeholder nonce used to locate the nonce inside the canonical block bytes.
+# JSON strings escape quotes, so the serialized marker can only match once,
+# at the header's own "nonce" key.
+_NONCE_MARKER = "\x00"
+_NONCE_FIELD = b'"nonce":' + canonical_encode(_NONCE_MARKER)
+
+
+# Number of times a block hash was actually (re)computed, see ``hash_stats``.
+_hash_recomputations = 0
+
+
+def hash_stats() -> Dict[str, int]:
+    return {"recomputations": _hash_recomputations}
+
+
+def reset_hash_stats():
+    global _hash_recomputations
+    _hash_recomputations = 0
+
+
+# v1: the block hash covers header, transactions, state and balances.
+# v2: the header carries Merkle roots of the body and is hashed alone.
+BLOCK_VERSIONS = (1, 2)
+
+
+@dataclass(frozen=True, slots=True)
 class BlockHeader:
     prev_hash: str
     height: int
     nonce: int
     timestamp: int
     miner: str
+    version: int = 1
+    tx_root: str = ""
+    state_root: str = ""
+    balances_root: str = ""
 
     def to_dict(self):
-        return {
+        data = {
             "prev_hash": self.prev_hash,
             "height": self.height,
             "nonce": self.nonce,
             "timestamp": self.timestamp,
             "miner": self.miner,
         }
+        if self.version >= 2:
+            data.update({
+                "version": self.version,
+                "tx_root": self.tx_root,
+                "state_root": self.state_root,
+                "balances_root": self.balances_root,
+            })
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
+    def with_nonce(self, nonce: int) -> "BlockHeader":
+        return replace(self, nonce=nonce)
+
+
+# Fields covered by the block hash; assigning any of them drops the cache.
+_HASHED_FIELDS = frozenset(("header", "transactions", "state", "balances"))
 
 
 @dataclass
 class Block:
+    """Block with a memoised hash.
+
+    The header is immutable and ``transactions`` is stored as a tuple, so the
+    cached canonical bytes and hash are only dropped when one of the hashed
+    fields is reassigned. ``state`` and ``balances`` must likewise be replaced
+    rather than mutated in place (or call ``invalidate_hash``).
+    """
+
     header: BlockHeader
-    transactions: List[Transaction]
+    transactions: Sequence[Transaction]
     state: Dict[str, int]
     balances: Dict[str, int]
     validator_signatures: Dict[str, str] = field(default_factory=dict)
     finalized: bool = False
     signers_frozen: List[str] = field(default_factory=list)
+    _canonical: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        if name in _HASHED_FIELDS:
+            if name == "transactions":
+                value = tuple(value)
+            object.__setattr__(self, "_canonical", None)
+            object.__setattr__(self, "_hash", None)
+        object.__setattr__(self, name, value)
+
+    def invalidate_hash(self):
+        self._canonical = None
+        self._hash = None
 
     def canonical_dict(self):
         return {
@@ -49,27 +129,109 @@ class Block:
             "balances": self.balances,
         }
 
+    def hashed_dict(self) -> Dict:
+        """What the block hash (and so PoW and validator signatures) covers."""
+        if self.header.version >= 2:
+            return self.header.to_dict()
+        return self.canonical_dict()
+
+    def canonical_bytes(self) -> bytes:
+        if self._canonical is None:
+            self._canonical = canonical_encode(self.hashed_dict())
+        return self._canonical
+
     def hash(self):
-        data = json.dumps(self.canonical_dict(), separators=(",", ":"), sort_keys=True).encode()
-        return sha256d(data)
+        global _hash_recomputations
+        if self._hash is None:
+            _hash_recomputations += 1
+            self._hash = sha256d(self.canonical_bytes())
+        return self._hash
+
+    def pow_template(self) -> PowTemplate:
+        data = self.hashed_dict()
+        header = data if self.header.version >= 2 else data["header"]
+        header["nonce"] = _NONCE_MARKER
+        prefix, marker, suffix = canonical_encode(data).partition(_NONCE_FIELD)
+        assert marker, "nonce field not found in canonical block"
+        return PowTemplate(prefix + b'"nonce":', suffix)
+
+    def tx_leaves(self) -> List[bytes]:
+        return [tx.wire_bytes() for tx in self.transactions]
+
+    def commitments(self) -> Dict[str, str]:
+        return {
+            "tx_root": merkle.merkle_root(self.tx_leaves()),
+            "state_root": merkle.mapping_root(self.state),
+            "balances_root": merkle.mapping_root(self.balances),
+        }
+
+    def commit_body(self):
+        """Store the body's Merkle roots in a v2 header (no-op for v1)."""
+        if self.header.version >= 2:
+            self.header = replace(self.header, **self.commitments())
+
+    def verify_commitments(self) -> bool:
+        """Check the v2 header roots against the body (v1 has none to check)."""
+        if self.header.version < 2:
+            return True
+        header = self.header
+        return self.commitments() == {
+            "tx_root": header.tx_root,
+            "state_root": header.state_root,
+            "balances_root": header.balances_root,
+        }
+
+    def tx_proof(self, index: int) -> merkle.Proof:
+        return merkle.merkle_proof(self.tx_leaves(), index)
+
+    def state_proof(self, key: str) -> merkle.Proof:
+        return merkle.mapping_proof(self.state, key)
+
+    def balance_proof(self, pubkey: str) -> merkle.Proof:
+        return merkle.mapping_proof(self.balances, pubkey)
 
     @classmethod
-    def create_candidate(cls, prev_hash: str, height: int, miner: str, txs: List[Transaction], parent_state: Dict[str, int], parent_balances: Dict[str, int]):
-        state = parent_state.copy()
-        for tx in txs:
-            state = dsl.execute(tx.script, state)
-        balances = parent_balances.copy()
-        header = BlockHeader(prev_hash=prev_hash, height=height, nonce=0, timestamp=int(time.time()), miner=miner)
-        return cls(header=header, transactions=txs, state=state, balances=balances)
-
-    def proof_of_work(self, difficulty_bits: int):
-        target = 2 ** (256 - difficulty_bits)
-        nonce = 0
-        while True:
-            self.header.nonce = nonce
-            if int(self.hash(), 16) < target:
-                break
-            nonce += 1
+    def create_candidate(cls, prev_hash: str, height: int, miner: str, txs: List[Transaction], parent_state: Mapping[str, int], parent_balances: Mapping[str, int], version: int = 1,
+                         executor: Optional[Executor] = None):
+        """Build a candidate block; with ``executor``, non-conflicting txs run in
+        parallel (see :func:`executor.execute_block`) with the same result."""
+        if executor is not None:
+            included, state = execute_block(txs, parent_state, executor)
+        else:
+            state = StateOverlay(parent_state)
+            included = []
+            for tx in txs:
+                # a failing script is excluded and its partial writes undone (spec 5.4)
+                state.begin()
+                try:
+                    dsl.apply(dsl.compile_script(tx.script), state)
+                except dsl.DSLExecutionError:
+                    state.rollback()
+                    continue
+                state.commit()
+                included.append(tx)
+        balances = dict(parent_balances.items())
+        if version not in BLOCK_VERSIONS:
+            raise ValueError(f"unsupported block version: {version}")
+        header = BlockHeader(prev_hash=prev_hash, height=height, nonce=0, timestamp=int(time.time()), miner=miner, version=version)
+        block = cls(header=header, transactions=included, state=state.to_dict(), balances=balances)
+        block.commit_body()
+        return block
+
+    def proof_of_work(self, difficulty_bits: int, workers: Optional[int] = None, cancel=None,
+                      progress: Optional[Callable[[MiningProgress], None]] = None) -> bool:
+        """Find and set a nonce; see :func:`miner.mine` for the parameters.
+
+        ``workers`` defaults to ``MINER_WORKERS`` of the loaded config.
+        Returns ``False`` when ``cancel`` fired before a solution was found.
+        """
+        if workers is None:
+            workers = config.CFG.MINER_WORKERS  # read at call time, after load_config
+        result = mine(self.pow_template(), difficulty_bits, workers=workers, cancel=cancel, progress=progress)
+        if result.nonce is None:
+            return False
+        self.header = self.header.with_nonce(result.nonce)
+        return True
 
     def to_json(self):
         data = self.canonical_dict()
@@ -81,6 +243,32 @@ class Block:
         })
         return data
 
+    @classmethod
+    def from_json(cls, data: Dict):
+        header = BlockHeader.from_dict(data["header"])
+        if header.version not in BLOCK_VERSIONS:
+            raise ValueError(f"unsupported block version: {header.version}")
+        return cls(
+            header=header,
+            transactions=[Transaction.from_json(tx) for tx in data["transactions"]],
+            state=data["state"],
+            balances=data["balances"],
+            validator_signatures=dict(data.get("validator_signatures", {})),
+            finalized=data.get("finalized", False),
+            signers_frozen=list(data.get("signers_frozen", [])),
+        )
+
+    def candidate(self, parent_balances: Mapping[str, int]) -> "Block":
+        """The block as it was mined and signed, i.e. before ``finalize``.
+
+        Finalization replaces the balances (and so the hash), while PoW and
+        validator signatures cover the candidate hash computed here.
+        """
+        block = Block(header=self.header, transactions=self.transactions, state=self.state,
+                      balances=dict(parent_balances.items()))
+        block.commit_body()
+        return block
+
     def add_validator_signature(self, pubkey: str, signature: str, validator_set: List[str]) -> bool:
         if pubkey not in validator_set:
             return False
@@ -89,21 +277,45 @@ class Block:
         self.validator_signatures[pubkey] = signature
         return True
 
-    def finalize(self, validator_set: List[str], parent_balances: Dict[str, int], cfg):
+    def quorum_signers(self, validator_set: List[str], cfg) -> List[str]:
         quorum = ceil(len(validator_set) * cfg.QUORUM_PERCENT / 100)
         signers = [v for v in validator_set if v in self.validator_signatures] #also check again valid signature to add to the list
         if len(signers) < quorum:
             raise ValueError("quorum not reached")
+        return signers
+
+    def balance_updates(self, signers: List[str], parent_balances: Mapping[str, int], cfg) -> Dict[str, int]:
+        """New balances of the accounts credited at finalization (miner, signers).
+
+        Only those accounts are read from ``parent_balances``, so it can be a
+        lazy mapping such as ``statedb.StateView``.
+        """
         premiums_total = sum(tx.premium for tx in self.transactions)
         share = premiums_total // len(signers) if signers else 0
         remainder = premiums_total % len(signers) if signers else 0
-        balances = parent_balances.copy()
-        balances[self.header.miner] = balances.get(self.header.miner, 0) + cfg.BLOCK_REWARD
+        updates: Dict[str, int] = {}
+
+        def credit(account: str, amount: int):
+            updates[account] = updates.get(account, parent_balances.get(account, 0)) + amount
+
+        credit(self.header.miner, cfg.BLOCK_REWARD)
         for v in signers:
-            balances[v] = balances.get(v, 0) + share
+            credit(v, share)
         if remainder and cfg.PREMIUM_REMAINDER_TARGET == "miner":
-            balances[self.header.miner] = balances.get(self.header.miner, 0) + remainder
+            credit(self.header.miner, remainder)
+        return updates
+
+    def finalize(self, validator_set: List[str], parent_balances: Mapping[str, int], cfg):
+        """Credit miner and signers; ``parent_balances`` may be a ``statedb.StateView``.
+
+        The finalized block carries every balance, so the parent map is read
+        once (a single query for a ``StateView``) and then updated.
+        """
+        signers = self.quorum_signers(validator_set, cfg)
+        balances = dict(parent_balances.items())
+        balances.update(self.balance_updates(signers, parent_balances, cfg))
         self.balances = balances
+        self.commit_body()
         self.signers_frozen = sorted(signers)
         self.finalized = True
         return self
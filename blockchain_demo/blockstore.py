@@ -0,0 +1,171 @@
+import os
+import json
+import mmap
+import glob
+import zlib
+import struct
+import argparse
+from typing import Dict, Iterator, Optional, Tuple
+from . import config
+
+# Record layout: magic | payload length | crc32(hash + payload) | raw hash (32 bytes) | payload
+MAGIC = b"BLK1"
+_HEADER = struct.Struct(">4sII32s")
+SEGMENT_PATTERN = "segment-%06d.dat"
+
+
+class BlockStoreError(Exception):
+    pass
+
+
+def _encode(block_json: Dict) -> bytes:
+    return json.dumps(block_json, separators=(",", ":"), sort_keys=True).encode()
+
+
+class BlockStore:
+    """Append-only block storage in segment files, read through ``mmap``.
+
+    Each block is appended as one record to the current segment; a new
+    segment starts once ``segment_max_bytes`` (``BLOCK_SEGMENT_BYTES`` by
+    default) is reached. ``index`` maps a
+    block hash to ``(segment, payload offset, payload length)`` and is rebuilt
+    on open by walking record headers. Records of the last segment are also
+    checksummed so a torn tail left by a crash is truncated away.
+    """
+
+    def __init__(self, root: str, segment_max_bytes: Optional[int] = None, fsync: bool = False):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes or config.CFG.BLOCK_SEGMENT_BYTES
+        self.fsync = fsync
+        self.index: Dict[str, Tuple[int, int, int]] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._writer = None
+        os.makedirs(root, exist_ok=True)
+        segments = sorted(
+            int(os.path.basename(p)[len("segment-"):-len(".dat")])
+            for p in glob.glob(os.path.join(root, "segment-*.dat"))
+        )
+        for seg in segments:
+            self._scan(seg, verify=seg == segments[-1])
+        self._active = segments[-1] if segments else 0
+        self._open_writer()
+
+    def _path(self, seg: int) -> str:
+        return os.path.join(self.root, SEGMENT_PATTERN % seg)
+
+    def _scan(self, seg: int, verify: bool):
+        path = self._path(seg)
+        size = os.path.getsize(path)
+        offset = 0
+        if size:
+            with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                while offset + _HEADER.size <= size:
+                    magic, length, crc, raw_hash = _HEADER.unpack_from(view, offset)
+                    start = offset + _HEADER.size
+                    if magic != MAGIC or start + length > size:
+                        break
+                    if verify and zlib.crc32(raw_hash + view[start:start + length]) != crc:
+                        break
+                    self.index[raw_hash.hex()] = (seg, start, length)
+                    offset = start + length
+        if offset != size:
+            if not verify:
+                raise BlockStoreError(f"corrupt record in sealed segment {path} at offset {offset}")
+            # torn write at the tail: drop the partial record
+            with open(path, "r+b") as fh:
+                fh.truncate(offset)
+
+    def _open_writer(self):
+        self._writer = open(self._path(self._active), "ab")
+
+    def _map(self, seg: int, needed: int) -> mmap.mmap:
+        view = self._maps.get(seg)
+        if view is None or len(view) < needed:
+            if view is not None:
+                view.close()
+            with open(self._path(seg), "rb") as fh:
+                view = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[seg] = view
+        return view
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def hashes(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def put(self, block_json: Dict) -> bool:
+        """Append a block (its ``to_json()`` form). Returns False if already stored."""
+        block_hash = block_json["hash"]
+        if block_hash in self.index:
+            return False
+        payload = _encode(block_json)
+        raw_hash = bytes.fromhex(block_hash)
+        if len(raw_hash) != 32:
+            raise BlockStoreError(f"invalid block hash: {block_hash}")
+        if self._writer.tell() and self._writer.tell() + _HEADER.size + len(payload) > self.segment_max_bytes:
+            self._writer.close()
+            self._active += 1
+            self._open_writer()
+        offset = self._writer.tell()
+        crc = zlib.crc32(raw_hash + payload)
+        self._writer.write(_HEADER.pack(MAGIC, len(payload), crc, raw_hash) + payload)
+        self._writer.flush()
+        if self.fsync:
+            os.fsync(self._writer.fileno())
+        self.index[block_hash] = (self._active, offset + _HEADER.size, len(payload))
+        return True
+
+    def get_raw(self, block_hash: str) -> bytes:
+        seg, offset, length = self.index[block_hash]
+        return self._map(seg, offset + length)[offset:offset + length]
+
+    def get(self, block_hash: str) -> Dict:
+        return json.loads(self.get_raw(block_hash))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for view in self._maps.values():
+            view.close()
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def import_block_dir(blocks_dir: str, store: BlockStore) -> int:
+    """Copy a legacy ``<hash>.json`` per-block directory into ``store``.
+
+    Blocks are appended in height order; returns how many were added.
+    """
+    blocks = []
+    for path in glob.glob(os.path.join(blocks_dir, "*.json")):
+        with open(path) as fh:
+            data = json.load(fh)
+        data.setdefault("hash", os.path.basename(path)[:-len(".json")])
+        blocks.append(data)
+    blocks.sort(key=lambda b: (b["header"]["height"], b["hash"]))
+    return sum(1 for data in blocks if store.put(data))
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Import a per-file blocks directory into a segmented block store")
+    parser.add_argument("blocks_dir", nargs="?", default=config.CFG.BLOCKS_DIR)
+    parser.add_argument("store_dir", nargs="?", default=config.CFG.BLOCK_STORE_DIR)
+    parser.add_argument("--segment-bytes", type=int, default=config.CFG.BLOCK_SEGMENT_BYTES)
+    args = parser.parse_args(argv)
+    with BlockStore(args.store_dir, args.segment_bytes) as store:
+        added = import_block_dir(args.blocks_dir, store)
+    print(f"imported {added} blocks into {args.store_dir}")
+
+
+if __name__ == "__main__":
+    main()
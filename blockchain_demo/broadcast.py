@@ -0,0 +1,148 @@
+import queue
+import threading
+from concurrent.futures import Future, as_completed
+from typing import Dict, Iterable, List, Optional
+from .network import PeerInfo, pooled_session
+from .wallet import verify
+
+
+class PeerSender:
+    """Bounded send queue drained by one worker thread for a single peer.
+
+    A slow or dead peer only backs up its own queue: when it is full,
+    ``submit`` returns ``None`` immediately (counted in ``dropped``) instead
+    of blocking the caller or the other peers.
+    """
+
+    def __init__(self, peer: PeerInfo, session, timeout: float, max_queue: int):
+        self.peer = peer
+        self.session = session
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=f"send-{peer.url}", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, payload: Dict, cancel: Optional[threading.Event] = None) -> Optional[Future]:
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((path, payload, future, cancel))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            path, payload, future, cancel = job
+            if (cancel is not None and cancel.is_set()) or not future.set_running_or_notify_cancel():
+                future.cancel()
+                continue
+            try:
+                r = self.session.post(self.peer.url + path, json=payload, timeout=self.timeout)
+                future.set_result(r.json())
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def close(self):
+        # drop queued jobs so the sentinel is picked up right away
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job[2].cancel()
+        self._queue.put(None)
+        self._thread.join()
+
+
+def rank_by_latency(peers: Iterable[PeerInfo]) -> List[PeerInfo]:
+    """Fastest measured peers first; never-probed peers (latency 0) last."""
+    return sorted(peers, key=lambda p: (p.latency_ms <= 0, p.latency_ms))
+
+
+class Broadcaster:
+    """Parallel fan-out of protocol messages following spec 7.5 routing."""
+
+    def __init__(self, peers: List[PeerInfo], timeout: float = 2.0, max_queue: int = 64, session=None):
+        self.peers = peers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self.session = session or pooled_session(max(4, len(peers)))
+        self._senders: Dict[str, PeerSender] = {}
+        self._lock = threading.Lock()
+
+    def sender(self, peer: PeerInfo) -> PeerSender:
+        with self._lock:
+            sender = self._senders.get(peer.url)
+            if sender is None:
+                sender = PeerSender(peer, self.session, self.timeout, self.max_queue)
+                self._senders[peer.url] = sender
+            return sender
+
+    def validators(self) -> List[PeerInfo]:
+        return rank_by_latency(p for p in self.peers if p.is_validator)
+
+    def broadcast(self, path: str, payload: Dict, targets: Optional[List[PeerInfo]] = None,
+                  cancel: Optional[threading.Event] = None) -> Dict[str, Future]:
+        """Queue ``payload`` for every target (all peers by default) without waiting.
+
+        Peers whose queue is full are left out of the returned futures.
+        """
+        futures = {}
+        for peer in (self.peers if targets is None else targets):
+            future = self.sender(peer).submit(path, payload, cancel)
+            if future is not None:
+                futures[peer.url] = future
+        return futures
+
+    def propose_block(self, block_json: Dict, validator_set: List[str], quorum: int) -> Dict[str, str]:
+        """Send ``block_proposal`` to validators (fastest first) until ``quorum``.
+
+        Validators answering with ``{"pubkey", "signature"}`` over the block
+        hash are counted once verified. As soon as ``quorum`` signatures are
+        in, sends that have not started yet are cancelled. Falls back to all
+        peers when no validator has been authenticated (spec 7.5).
+        """
+        targets = self.validators() or rank_by_latency(self.peers)
+        cancel = threading.Event()
+        futures = self.broadcast("/block_proposal", block_json, targets, cancel)
+        signatures: Dict[str, str] = {}
+        for future in as_completed(futures.values()):
+            if future.cancelled() or future.exception() is not None:
+                continue
+            resp = future.result()
+            pubkey, sig = resp.get("pubkey"), resp.get("signature")
+            if pubkey in validator_set and sig and verify(pubkey, block_json["hash"], sig):
+                signatures[pubkey] = sig
+            if len(signatures) >= quorum:
+                cancel.set()
+                for other in futures.values():
+                    other.cancel()
+                break
+        return signatures
+
+    def send_signature_update(self, update: Dict, miner: Optional[PeerInfo] = None) -> Dict[str, Future]:
+        """``block_sig_update`` goes to authenticated validators plus the source miner."""
+        targets = self.validators()
+        if miner is not None and miner not in targets:
+            targets.append(miner)
+        return self.broadcast("/block_signature", update, targets)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {url: {"pending": s.pending(), "dropped": s.dropped} for url, s in self._senders.items()}
+
+    def close(self):
+        with self._lock:
+            senders = list(self._senders.values())
+            self._senders.clear()
+        for sender in senders:
+            sender.close()
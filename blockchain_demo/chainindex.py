@@ -0,0 +1,206 @@
+import os
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+GENESIS_PREV_HASH = "0" * 64
+
+
+def block_work(block_hash: str) -> int:
+    """Expected number of hashes needed to find ``block_hash``."""
+    return 2 ** 256 // (int(block_hash, 16) + 1)
+
+
+@dataclass
+class IndexEntry:
+    hash: str
+    parent: str
+    height: int
+    timestamp: int
+    work: int
+    chain_work: int
+    finalized: bool
+    # on the finalized chain: this block and all its ancestors are finalized
+    eligible: bool = False
+    children: List[str] = field(default_factory=list)
+    # jumps[k] is the hash of the ancestor 2**k blocks below this one
+    jumps: List[str] = field(default_factory=list, repr=False)
+
+
+def _better(a: IndexEntry, b: IndexEntry) -> bool:
+    """Fork choice (spec 5.9): longest finalized chain, then total PoW,
+    then lowest hash, then earliest timestamp."""
+    if a.height != b.height:
+        return a.height > b.height
+    if a.chain_work != b.chain_work:
+        return a.chain_work > b.chain_work
+    if a.hash != b.hash:
+        return a.hash < b.hash
+    return a.timestamp < b.timestamp
+
+
+class ChainIndex:
+    """Persistent block graph with incremental fork choice.
+
+    Each inserted block costs O(log n) (its binary-lifting jump table) plus an
+    O(1) comparison with the current best tip, so the graph is never rebuilt
+    from ``BLOCKS_DIR``. Ancestor and common-ancestor queries walk the jump
+    tables in O(log n). When ``path`` is set every change is appended to a
+    JSON-lines log that ``load`` replays at startup.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, IndexEntry] = {}
+        self.best: Optional[IndexEntry] = None
+        self._log = None
+
+    @classmethod
+    def load(cls, path: str) -> "ChainIndex":
+        index = cls()
+        if os.path.exists(path):
+            good = 0  # end of the last complete record
+            with open(path, "rb") as fh:
+                for line in fh:
+                    if not line.endswith(b"\n"):
+                        break  # torn last line
+                    if line.strip():
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break
+                        if record["op"] == "add":
+                            index.add(record["hash"], record["parent"], record["height"], record["timestamp"],
+                                      record["finalized"], int(record["work"]))
+                        elif record["op"] == "finalize":
+                            index.mark_finalized(record["hash"])
+                    good += len(line)
+            if good != os.path.getsize(path):
+                # drop the partial record so new appends start on a fresh line
+                with open(path, "r+b") as fh:
+                    fh.truncate(good)
+        index.path = path
+        return index
+
+    def _append(self, record: Dict):
+        if self.path is None:
+            return
+        if self._log is None:
+            self._log = open(self.path, "a")
+        self._log.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._log.flush()
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, block_hash: str) -> IndexEntry:
+        return self.entries[block_hash]
+
+    @property
+    def tip(self) -> Optional[str]:
+        return self.best.hash if self.best else None
+
+    def add(self, block_hash: str, parent: str, height: int, timestamp: int, finalized: bool,
+            work: Optional[int] = None) -> IndexEntry:
+        if block_hash in self.entries:
+            return self.entries[block_hash]
+        if work is None:
+            work = block_work(block_hash)
+        parent_entry = self.entries.get(parent)
+        if parent_entry is None:
+            if height != 0:
+                raise KeyError(f"unknown parent {parent} for block {block_hash}")
+            entry = IndexEntry(block_hash, parent, 0, timestamp, work, work, finalized, eligible=finalized)
+        else:
+            if height != parent_entry.height + 1:
+                raise ValueError(f"block {block_hash} height {height} does not follow its parent")
+            entry = IndexEntry(block_hash, parent, height, timestamp, work, parent_entry.chain_work + work,
+                               finalized, eligible=finalized and parent_entry.eligible)
+            entry.jumps.append(parent)
+            k = 0
+            while k < len(self.entries[entry.jumps[k]].jumps):
+                entry.jumps.append(self.entries[entry.jumps[k]].jumps[k])
+                k += 1
+            parent_entry.children.append(block_hash)
+        self.entries[block_hash] = entry
+        self._append({"op": "add", "hash": block_hash, "parent": parent, "height": height,
+                      "timestamp": timestamp, "finalized": finalized, "work": str(work)})
+        if entry.eligible:
+            self._consider(entry)
+        return entry
+
+    def add_block(self, block_json: Dict) -> IndexEntry:
+        header = block_json["header"]
+        return self.add(block_json["hash"], header["prev_hash"], header["height"], header["timestamp"],
+                        block_json.get("finalized", False))
+
+    def mark_finalized(self, block_hash: str):
+        entry = self.entries[block_hash]
+        if entry.finalized:
+            return
+        entry.finalized = True
+        self._append({"op": "finalize", "hash": block_hash})
+        parent = self.entries.get(entry.parent)
+        if entry.height == 0 or (parent is not None and parent.eligible):
+            # this block, and any finalized descendants waiting on it, join the chain
+            stack = [entry]
+            while stack:
+                current = stack.pop()
+                current.eligible = True
+                self._consider(current)
+                stack.extend(self.entries[c] for c in current.children if self.entries[c].finalized)
+
+    def _consider(self, entry: IndexEntry):
+        if self.best is None or _better(entry, self.best):
+            self.best = entry
+
+    def ancestor(self, block_hash: str, height: int) -> str:
+        entry = self.entries[block_hash]
+        if not 0 <= height <= entry.height:
+            raise ValueError(f"height {height} outside 0..{entry.height}")
+        distance = entry.height - height
+        k = 0
+        while distance:
+            if distance & 1:
+                entry = self.entries[entry.jumps[k]]
+            distance >>= 1
+            k += 1
+        return entry.hash
+
+    def canonical_at(self, height: int) -> Optional[str]:
+        """Hash of the best chain's block at ``height`` (``None`` if beyond the tip)."""
+        if self.best is None or height > self.best.height:
+            return None
+        return self.ancestor(self.best.hash, height)
+
+    def common_ancestor(self, a: str, b: str) -> Optional[str]:
+        ea, eb = self.entries[a], self.entries[b]
+        if ea.height > eb.height:
+            ea = self.entries[self.ancestor(ea.hash, eb.height)]
+        elif eb.height > ea.height:
+            eb = self.entries[self.ancestor(eb.hash, ea.height)]
+        if ea.hash == eb.hash:
+            return ea.hash
+        for k in reversed(range(len(ea.jumps))):
+            if k < len(ea.jumps) and ea.jumps[k] != eb.jumps[k]:
+                ea, eb = self.entries[ea.jumps[k]], self.entries[eb.jumps[k]]
+        if not ea.jumps or ea.jumps[0] != eb.jumps[0]:
+            return None  # different genesis blocks
+        return ea.jumps[0]
+
+    def chain(self, tip: Optional[str] = None) -> List[str]:
+        """Hashes from genesis up to ``tip`` (the best tip by default)."""
+        entry = self.entries[tip] if tip else self.best
+        hashes = []
+        while entry is not None:
+            hashes.append(entry.hash)
+            entry = self.entries.get(entry.parent) if entry.height else None
+        return hashes[::-1]
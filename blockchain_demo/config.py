@@ -23,6 +23,18 @@ class Config:
     BLOCK_CANDIDATE_TTL: int = 120
     PREMIUM_REFUND_ON_FAIL: bool = True
     PREMIUM_REMAINDER_TARGET: str = "miner"
+    MINER_WORKERS: int = 1
+    BLOCK_STORE_DIR: str = "./blockstore"
+    BLOCK_SEGMENT_BYTES: int = 64 * 1024 * 1024
+    CHAIN_INDEX_FILE: str = "chainindex.log"
+    STATE_CHECKPOINT_INTERVAL: int = 100
+    STATE_BACKEND: str = "json"
+    STATE_DB_FILE: str = "state.sqlite"
+    EXPLORER_INDEX_FILE: str = "explorer.sqlite"
+    MEMPOOL_MAX_TXS: int = 10_000
+    MEMPOOL_MAX_BYTES: int = 8 * 1024 * 1024
+    MEMPOOL_MAX_PER_SENDER: int = 64
+    MEMPOOL_TX_TTL: int = 3600
 
 CFG = Config()
 
@@ -61,6 +73,15 @@ def load_config(path: str) -> Config:
 
     if not 1 <= cfg.QUORUM_PERCENT <= 100:
         raise ValueError("QUORUM_PERCENT must be between 1 and 100")
+    if cfg.STATE_BACKEND not in ("json", "sqlite"):
+        raise ValueError("STATE_BACKEND must be 'json' or 'sqlite'")
+    if cfg.MINER_WORKERS < 1:
+        raise ValueError("MINER_WORKERS must be >= 1")
+    if cfg.STATE_CHECKPOINT_INTERVAL < 1:
+        raise ValueError("STATE_CHECKPOINT_INTERVAL must be >= 1")
+    for name in ("MEMPOOL_MAX_TXS", "MEMPOOL_MAX_BYTES", "MEMPOOL_MAX_PER_SENDER", "MEMPOOL_TX_TTL"):
+        if getattr(cfg, name) < 1:
+            raise ValueError(f"{name} must be >= 1")
 
     os.makedirs(cfg.BLOCKS_DIR, exist_ok=True)
     os.makedirs(cfg.PENDING_DIR, exist_ok=True)
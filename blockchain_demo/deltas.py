@@ -0,0 +1,103 @@
+from typing import Dict, List, Mapping, MutableMapping, Optional, Tuple
+from .config import CFG
+
+# A delta lists the keys a block set (new or changed value) and removed.
+Delta = Dict[str, object]
+
+
+def compute_delta(parent: Mapping[str, int], child: Mapping[str, int]) -> Delta:
+    changed = {k: v for k, v in child.items() if k not in parent or parent[k] != v}
+    removed = sorted(k for k in parent if k not in child)
+    return {"set": changed, "del": removed}
+
+
+def delta_from_writes(writes: Mapping[str, int]) -> Delta:
+    """Delta of a block that only wrote ``writes`` (e.g. ``StateOverlay.writes``)."""
+    return {"set": dict(writes), "del": []}
+
+
+def apply_delta(base: MutableMapping[str, int], delta: Delta) -> None:
+    base.update(delta["set"])  # type: ignore[arg-type]
+    for key in delta["del"]:  # type: ignore[union-attr]
+        base.pop(key, None)
+
+
+class DeltaStore:
+    """Per-block state/balance deltas with a full checkpoint every N blocks.
+
+    ``records`` maps a block hash to its record and can be any mutable
+    mapping (a dict, or a ``shelve`` for persistence). Every record holds the
+    block's deltas, so ``diff`` is a single lookup; records at heights that
+    are multiples of ``checkpoint_interval`` (and parentless roots) also hold
+    full snapshots, so ``get`` applies at most ``checkpoint_interval - 1``
+    deltas forward from the nearest checkpoint.
+    """
+
+    def __init__(self, checkpoint_interval: Optional[int] = None,
+                 records: Optional[MutableMapping[str, Dict]] = None):
+        self.checkpoint_interval = checkpoint_interval or CFG.STATE_CHECKPOINT_INTERVAL
+        if self.checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be >= 1")
+        self.records: MutableMapping[str, Dict] = records if records is not None else {}
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.records
+
+    def is_checkpoint(self, block_hash: str) -> bool:
+        return "state" in self.records[block_hash]
+
+    def put(self, block_hash: str, parent_hash: Optional[str], height: int,
+            state_delta: Delta, balances_delta: Delta,
+            state: Optional[Dict[str, int]] = None, balances: Optional[Dict[str, int]] = None):
+        """Store a block's deltas; full snapshots are only kept at checkpoints.
+
+        At a checkpoint height, ``state``/``balances`` may be passed to avoid
+        rebuilding them from the parent.
+        """
+        record: Dict = {
+            "parent": parent_hash,
+            "height": height,
+            "state_delta": state_delta,
+            "balances_delta": balances_delta,
+        }
+        root = parent_hash is None or parent_hash not in self.records
+        if root or height % self.checkpoint_interval == 0:
+            if state is None or balances is None:
+                if root:
+                    raise ValueError(f"block {block_hash} has no stored parent: full state required")
+                state, balances = self.get(parent_hash)  # type: ignore[arg-type]
+                apply_delta(state, state_delta)
+                apply_delta(balances, balances_delta)
+            record["state"] = dict(state)
+            record["balances"] = dict(balances)
+        self.records[block_hash] = record
+
+    def put_block(self, block_json: Dict, parent_state: Mapping[str, int], parent_balances: Mapping[str, int]):
+        """Store a full-snapshot block (``Block.to_json()``) as deltas vs. its parent."""
+        header = block_json["header"]
+        parent = header["prev_hash"] if header["height"] > 0 else None
+        self.put(
+            block_json["hash"], parent, header["height"],
+            compute_delta(parent_state, block_json["state"]),
+            compute_delta(parent_balances, block_json["balances"]),
+            state=block_json["state"], balances=block_json["balances"],
+        )
+
+    def get(self, block_hash: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Rebuild the full ``(state, balances)`` after ``block_hash``."""
+        pending: List[Dict] = []
+        record = self.records[block_hash]
+        while "state" not in record:
+            pending.append(record)
+            record = self.records[record["parent"]]
+        state = dict(record["state"])
+        balances = dict(record["balances"])
+        for record in reversed(pending):
+            apply_delta(state, record["state_delta"])
+            apply_delta(balances, record["balances_delta"])
+        return state, balances
+
+    def diff(self, block_hash: str) -> Dict[str, Delta]:
+        """State/balances delta vs. the parent, as served by ``/diff/<hash>``."""
+        record = self.records[block_hash]
+        return {"state": record["state_delta"], "balances": record["balances_delta"]}
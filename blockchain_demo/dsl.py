@@ -1,5 +1,7 @@
 import re
-from typing import Dict, List, Tuple, Union
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple, Union
 
 IDENT_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
 INT_RE = re.compile(r"\d+")
@@ -71,29 +73,72 @@ def parse_script(script: str):
     return statements
 
 
+# Number of compiled scripts kept by ``compile_script``.
+COMPILE_CACHE_SIZE = 4096
+
+# A term is (sign, operand): sign is +1/-1, operand an int literal or a state key.
+Term = Tuple[int, Union[int, str]]
+
+
+@dataclass(frozen=True)
+class CompiledScript:
+    """Pre-resolved form of a script: literals are ints, variables are keys."""
+
+    statements: Tuple[Tuple[str, Tuple[Term, ...]], ...]
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_script(script: str) -> CompiledScript:
+    """Parse ``script`` once and return its compiled form.
+
+    Results are memoised in an LRU cache keyed by the script text, so the
+    mempool, the block builder and block replay share a single parse per
+    script. Invalid scripts raise :class:`DSLExecutionError` and are not cached.
+    """
+    statements = []
+    reads = set()
+    for var, expr_ast in parse_script(script):
+        terms: List[Term] = []
+        for item in expr_ast:
+            op, token = ('+', item) if isinstance(item, str) else item
+            operand: Union[int, str]
+            if INT_RE.fullmatch(token):
+                operand = int(token)
+            else:
+                operand = token
+                reads.add(token)
+            terms.append((1 if op == '+' else -1, operand))
+        statements.append((var, tuple(terms)))
+    return CompiledScript(
+        statements=tuple(statements),
+        reads=frozenset(reads),
+        writes=frozenset(var for var, _ in statements),
+    )
+
+
+def apply(compiled: CompiledScript, state) -> None:
+    """Run ``compiled`` against ``state`` in place."""
+    for var, terms in compiled.statements:
+        state[var] = _eval_terms(terms, state)
+
+
 def execute(script: str, state: Dict[str, int]) -> Dict[str, int]:
     state = state.copy()
-    for var, expr_ast in parse_script(script):
-        value = _eval_expression(expr_ast, state)
-        state[var] = value
+    apply(compile_script(script), state)
     return state
 
 
-def _eval_expression(ast: List[Union[str, Tuple[str, str]]], state: Dict[str, int]) -> int:
-    def term_value(token: str) -> int:
-        if INT_RE.fullmatch(token):
-            return int(token)
-        if token in state:
-            return state[token]
-        raise DSLExecutionError(f"Unknown variable: {token}")
-
-    first = ast[0]
-    result = term_value(first)
-    for item in ast[1:]:
-        op, term = item
-        val = term_value(term)
-        if op == '+':
-            result += val
+def _eval_terms(terms: Tuple[Term, ...], state) -> int:
+    result = 0
+    for sign, operand in terms:
+        if isinstance(operand, int):
+            value = operand
         else:
-            result -= val
+            try:
+                value = state[operand]
+            except KeyError:
+                raise DSLExecutionError(f"Unknown variable: {operand}") from None
+        result += sign * value
     return result
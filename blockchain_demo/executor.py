@@ -0,0 +1,87 @@
+from concurrent.futures import Executor
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from .transaction import Transaction
+from .overlay import StateOverlay
+from . import dsl
+
+# Below this many txs in a level, shipping them to a process pool costs more than it saves.
+PARALLEL_MIN_LEVEL = 32
+
+
+def conflict_levels(scripts: Sequence[dsl.CompiledScript]) -> List[List[int]]:
+    """Group tx indexes into levels that can run in parallel, in order.
+
+    A tx goes after every earlier tx that writes a key it reads or writes
+    (read-after-write, write-after-write), and no earlier than any earlier
+    tx reading a key it writes (write-after-read: same level is fine, since
+    a level reads the state left by the previous levels). Running the levels
+    one after another therefore matches sequential execution.
+    """
+    last_write: Dict[str, int] = {}
+    last_read: Dict[str, int] = {}
+    levels: List[List[int]] = []
+    for i, script in enumerate(scripts):
+        level = 0
+        for key in script.reads | script.writes:
+            if key in last_write:
+                level = max(level, last_write[key] + 1)
+        for key in script.writes:
+            level = max(level, last_read.get(key, 0))
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(i)
+        for key in script.writes:
+            last_write[key] = level
+        for key in script.reads:
+            last_read[key] = max(level, last_read.get(key, 0))
+    return levels
+
+
+def run_script(script: str, inputs: Dict[str, int]) -> Optional[Dict[str, int]]:
+    """Run one tx on the values it reads; its writes, or ``None`` if it fails."""
+    state = StateOverlay(inputs)
+    try:
+        dsl.apply(dsl.compile_script(script), state)
+    except dsl.DSLExecutionError:
+        return None
+    return state.writes
+
+
+def execute_block(txs: Sequence[Transaction], parent_state: Mapping[str, int],
+                  executor: Optional[Executor] = None, strict: bool = False) -> Tuple[List[Transaction], StateOverlay]:
+    """Run ``txs`` level by level; same result as ``Block.create_candidate``'s loop.
+
+    Each tx of a level only gets the parent values of its read set, so with
+    ``executor`` (e.g. a ``ProcessPoolExecutor``) levels of at least
+    ``PARALLEL_MIN_LEVEL`` txs run in parallel. Failing txs are excluded and
+    their writes dropped. Returns the included txs, in block order, and the
+    post-state overlay.
+
+    With ``strict`` (replaying a received block) any failing tx raises
+    ``DSLExecutionError`` instead, since a valid block only holds txs that run.
+    """
+    runnable: List[Tuple[int, dsl.CompiledScript]] = []
+    for i, tx in enumerate(txs):
+        try:
+            runnable.append((i, dsl.compile_script(tx.script)))
+        except dsl.DSLExecutionError:
+            if strict:
+                raise
+            continue  # never included, like a script failing at run time
+    state = StateOverlay(parent_state)
+    ok = [False] * len(txs)
+    for positions in conflict_levels([c for _, c in runnable]):
+        level = [runnable[p][0] for p in positions]
+        jobs = [(txs[i].script, {k: state[k] for k in runnable[p][1].reads if k in state})
+                for i, p in zip(level, positions)]
+        if executor is not None and len(level) >= PARALLEL_MIN_LEVEL:
+            results = list(executor.map(run_script, *zip(*jobs)))
+        else:
+            results = [run_script(*job) for job in jobs]
+        for i, writes in zip(level, results):
+            if writes is not None:
+                state.writes.update(writes)
+                ok[i] = True
+            elif strict:
+                raise dsl.DSLExecutionError(f"transaction {i} ({txs[i].hash()}) failed")
+    return [tx for tx, included in zip(txs, ok) if included], state
@@ -0,0 +1,319 @@
+import os
+import json
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from .chainindex import ChainIndex
+from . import config
+from .txindex import ExplorerIndex
+
+# Streamed responses are sent in chunks of roughly this size.
+CHUNK_BYTES = 64 * 1024
+
+StateLoader = Callable[[str], Tuple[Mapping[str, int], Mapping[str, int]]]
+DiffLoader = Callable[[str], Dict]
+
+
+class Response(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: Iterable[bytes]
+
+
+def _dumps(data) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _buffered(parts: Iterable[bytes]) -> Iterator[bytes]:
+    """Group small pieces into ``CHUNK_BYTES`` writes."""
+    buf: List[bytes] = []
+    size = 0
+    for part in parts:
+        buf.append(part)
+        size += len(part)
+        if size >= CHUNK_BYTES:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def stream_list(items: Iterable[bytes], key: str, extra: Optional[Dict] = None) -> Iterator[bytes]:
+    """``{"<key>": [items...], **extra}`` with each item already JSON-encoded."""
+    def parts():
+        yield b'{"' + key.encode() + b'":['
+        for i, item in enumerate(items):
+            yield item if i == 0 else b"," + item
+        yield b"]"
+        for k, v in (extra or {}).items():
+            yield b"," + _dumps(k) + b":" + _dumps(v)
+        yield b"}"
+    return _buffered(parts())
+
+
+def _deferred(produce: Callable[[], Iterable[bytes]]) -> Iterator[bytes]:
+    """A body built on first read, so a 304 never builds it."""
+    yield from produce()
+
+
+def stream_mapping(mapping: Mapping[str, int]) -> Iterator[bytes]:
+    def parts():
+        yield b"{"
+        for i, key in enumerate(mapping):
+            yield (b"" if i == 0 else b",") + _dumps(key) + b":" + _dumps(mapping[key])
+        yield b"}"
+    return _buffered(parts())
+
+
+class ResponseCache:
+    """LRU of encoded response bodies keyed by ``(tip hash, path)``.
+
+    Only bodies up to ``max_body_bytes`` are kept, so very large streamed
+    responses are never held in memory.
+    """
+
+    def __init__(self, max_entries: int = 256, max_body_bytes: int = 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, str], body: bytes):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def fill(self, key: Tuple[str, str], chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass ``chunks`` through, caching the body if it stays small enough."""
+        kept: Optional[List[bytes]] = []
+        size = 0
+        for chunk in chunks:
+            if kept is not None:
+                size += len(chunk)
+                if size <= self.max_body_bytes:
+                    kept.append(chunk)
+                else:
+                    kept = None
+            yield chunk
+        if kept is not None:
+            self.put(key, b"".join(kept))
+
+
+class Explorer:
+    """Explorer REST API (spec 6.2) over the chain index and block store.
+
+    Every response depends only on the canonical tip, so the ETag is derived
+    from the tip hash and the request path, and bodies are cached per tip.
+    Routes check that the resource exists up front (404/400 otherwise) and
+    build their body lazily, so a matching ``If-None-Match`` gets a 304
+    without touching any block.
+    Blocks are served from ``raw_block`` (e.g. ``BlockStore.get_raw``) as
+    stored, without re-encoding or re-hashing. ``/chain`` and
+    ``/address/<pubkey>`` are cursor-paginated; large bodies are streamed.
+    ``/diff/<hash>`` is served by ``diff`` (e.g. ``DeltaStore.diff``) when given.
+    """
+
+    def __init__(self, chain: ChainIndex, raw_block: Callable[[str], bytes], state_at: StateLoader,
+                 index: Optional[ExplorerIndex] = None, page_size: int = 50, max_page_size: int = 500,
+                 cache: Optional[ResponseCache] = None, diff: Optional[DiffLoader] = None):
+        self.chain = chain
+        self.diff_loader = diff
+        self.raw_block = raw_block
+        self.state_at = state_at
+        self.index = index
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.cache = cache or ResponseCache()
+        self.routes: Dict[str, Callable[[str, Dict[str, str]], Iterable[bytes]]] = {
+            "chain": self.chain_page,
+            "branches": self.branches,
+            "block": self.block,
+            "state": self.state,
+            "balances": self.balances,
+            "tx": self.tx,
+            "address": self.address,
+            "diff": self.diff,
+        }
+
+    def etag(self, tip: str, path: str) -> str:
+        return '"' + hashlib.sha256(f"{tip} {path}".encode()).hexdigest()[:32] + '"'
+
+    def handle(self, path: str, headers: Optional[Mapping[str, str]] = None) -> Response:
+        url = urlsplit(path)
+        parts = url.path.strip("/").split("/", 1)
+        route = self.routes.get(parts[0])
+        if route is None:
+            return Response(404, {}, [b'{"error":"not found"}'])
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            chunks = route(parts[1] if len(parts) > 1 else "", query)
+        except (KeyError, ValueError) as exc:
+            return Response(404 if isinstance(exc, KeyError) else 400, {}, [_dumps({"error": str(exc)})])
+        tip = self.chain.tip or ""
+        etag = self.etag(tip, path)
+        if headers and headers.get("If-None-Match") == etag:
+            return Response(304, {"ETag": etag}, [])
+        response_headers = {"ETag": etag, "Content-Type": "application/json"}
+        key = (tip, path)
+        body = self.cache.get(key)
+        if body is not None:
+            return Response(200, response_headers, [body])
+        return Response(200, response_headers, self.cache.fill(key, chunks))
+
+    def _limit(self, query: Dict[str, str]) -> int:
+        limit = int(query.get("limit", self.page_size))
+        if not 1 <= limit <= self.max_page_size:
+            raise ValueError(f"limit must be between 1 and {self.max_page_size}")
+        return limit
+
+    def chain_page(self, _: str, query: Dict[str, str]) -> Iterable[bytes]:
+        """Canonical blocks from height ``cursor`` (0 by default), ``limit`` per page."""
+        start, limit = int(query.get("cursor", 0)), self._limit(query)
+
+        def produce():
+            tip = self.chain.best
+            end = min(start + limit, tip.height + 1) if tip else start
+            hashes = [self.chain.canonical_at(h) for h in range(start, end)]
+            next_cursor = end if tip and end <= tip.height else None
+            return stream_list((self.raw_block(h) for h in hashes), "blocks", {"next": next_cursor})
+        return _deferred(produce)
+
+    def branches(self, _: str, query: Dict[str, str]) -> Iterable[bytes]:
+        """Finalized tips that no finalized block builds on."""
+        tips = [
+            {"hash": e.hash, "height": e.height, "chain_work": e.chain_work}
+            for e in self.chain.entries.values()
+            if e.eligible and not any(self.chain.entries[c].eligible for c in e.children)
+        ]
+        tips.sort(key=lambda t: (-t["height"], t["hash"]))
+        return [_dumps({"tip": self.chain.tip, "branches": tips})]
+
+    def block(self, block_hash: str, query: Dict[str, str]) -> Iterable[bytes]:
+        if block_hash not in self.chain:
+            raise KeyError(f"unknown block {block_hash}")
+        return _deferred(lambda: [self.raw_block(block_hash)])
+
+    def state(self, _: str, query: Dict[str, str]) -> Iterable[bytes]:
+        return _deferred(lambda: stream_mapping(self.state_at(self.chain.tip)[0]))
+
+    def balances(self, _: str, query: Dict[str, str]) -> Iterable[bytes]:
+        return _deferred(lambda: stream_mapping(self.state_at(self.chain.tip)[1]))
+
+    def diff(self, block_hash: str, query: Dict[str, str]) -> Iterable[bytes]:
+        """State and balances deltas of a block against its parent."""
+        if self.diff_loader is None:
+            raise KeyError("state diffs not configured")
+        if block_hash not in self.chain:
+            raise KeyError(f"unknown block {block_hash}")
+        return _deferred(lambda: [_dumps(self.diff_loader(block_hash))])  # type: ignore[misc]
+
+    def _require_index(self) -> ExplorerIndex:
+        if self.index is None:
+            raise KeyError("explorer index not configured")
+        return self.index
+
+    def tx(self, tx_hash: str, query: Dict[str, str]) -> Iterable[bytes]:
+        ref = self._require_index().tx(tx_hash)
+        if ref is None:
+            raise KeyError(f"unknown transaction {tx_hash}")
+
+        def produce():
+            tx = json.loads(self.raw_block(ref.block_hash))["transactions"][ref.position]
+            return [_dumps({"tx": tx, "block_hash": ref.block_hash, "height": ref.height, "position": ref.position})]
+        return _deferred(produce)
+
+    def address(self, pubkey: str, query: Dict[str, str]) -> Iterable[bytes]:
+        """Balance plus one page of sent txs; ``cursor`` is ``height:position``."""
+        index, limit = self._require_index(), self._limit(query)
+        after = tuple(int(x) for x in query["cursor"].split(":")) if "cursor" in query else None
+
+        def produce():
+            refs = index.address_txs(pubkey, after=after, limit=limit + 1)  # type: ignore[arg-type]
+            next_cursor = f"{refs[limit - 1].height}:{refs[limit - 1].position}" if len(refs) > limit else None
+            balance = self.state_at(self.chain.tip)[1].get(pubkey, 0)
+            return stream_list((_dumps(ref._asdict()) for ref in refs[:limit]), "txs",
+                               {"address": pubkey, "balance": balance, "next": next_cursor})
+        return _deferred(produce)
+
+
+def make_handler(explorer: Explorer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            response = explorer.handle(self.path, self.headers)
+            self.send_response(response.status)
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+            if response.status == 304:
+                self.end_headers()
+                return
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in response.body:
+                if chunk:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(explorer: Explorer, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(explorer))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[list] = None):
+    from .blockstore import BlockStore
+    from .deltas import compute_delta
+
+    parser = argparse.ArgumentParser(description="Serve the explorer REST API")
+    parser.add_argument("chain_index")
+    parser.add_argument("block_store", nargs="?", default=config.CFG.BLOCK_STORE_DIR)
+    parser.add_argument("--index-db", default=os.path.join(config.CFG.DATA_DIR, config.CFG.EXPLORER_INDEX_FILE),
+                        help="built by txindex; /tx and /address are disabled when it does not exist")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+    chain = ChainIndex.load(args.chain_index)
+    store = BlockStore(args.block_store)
+
+    def state_at(block_hash: str):
+        # blocks carry their full post-state and balances
+        data = store.get(block_hash)
+        return data["state"], data["balances"]
+
+    def diff(block_hash: str):
+        data = store.get(block_hash)
+        parent = store.get(data["header"]["prev_hash"]) if data["header"]["height"] else {"state": {}, "balances": {}}
+        return {"state": compute_delta(parent["state"], data["state"]),
+                "balances": compute_delta(parent["balances"], data["balances"])}
+
+    index = ExplorerIndex(args.index_db) if os.path.exists(args.index_db) else None
+    server = serve(Explorer(chain, store.get_raw, state_at, index, diff=diff), port=args.port)
+    print(f"explorer listening on port {args.port}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
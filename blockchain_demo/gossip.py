@@ -0,0 +1,215 @@
+import math
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from .transaction import Transaction
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RotatingBloomFilter:
+    """Bounded seen-set: two Bloom generations, the older one dropped on rotation.
+
+    Remembers at least the last ``capacity`` keys (at most ``2 * capacity``)
+    in constant memory.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous: Optional[BloomFilter] = None
+
+    def add(self, key: str):
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+        self.current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.current or (self.previous is not None and key in self.previous)
+
+
+class TxGossip:
+    """Batched, announce-first transaction gossip.
+
+    Outgoing transactions are buffered and flushed as a single
+    ``/tx_announce`` of their hashes once the batch reaches ``max_batch_txs``
+    or ``max_batch_bytes``, or ``max_delay`` seconds after its first tx.
+    Receivers answer an announce with the hashes they miss (``on_announce``),
+    fetch those bodies (``serve_fetch`` on the sender side), and hand them to
+    ``on_txs``, which drops already-seen txs before any signature work and
+    admits the rest through ``Mempool.add_txs`` in one call, verifying on
+    ``executor`` when given. Accepted txs are queued for relay.
+
+    A tx hash does not cover the signature, so a hash only enters the seen-set
+    once the mempool accepted the tx: a forged copy fails verification and
+    cannot shadow the genuine one.
+    """
+
+    def __init__(self, mempool, send: Callable[[str, Dict], object], max_batch_txs: int = 256,
+                 max_batch_bytes: int = 64 * 1024, max_delay: float = 0.2, seen_capacity: int = 100_000,
+                 known_capacity: int = 10_000, fetch_timeout: float = 5.0, executor: Optional[Executor] = None):
+        self.mempool = mempool
+        self.executor = executor
+        self.send = send
+        self.max_batch_txs = max_batch_txs
+        self.max_batch_bytes = max_batch_bytes
+        self.max_delay = max_delay
+        self.fetch_timeout = fetch_timeout
+        self.seen = RotatingBloomFilter(seen_capacity)
+        self.known: "OrderedDict[str, Transaction]" = OrderedDict()
+        self.known_capacity = known_capacity
+        self.requested: Dict[str, float] = {}
+        self.duplicates = 0
+        self._batch: List[str] = []
+        self._batch_bytes = 0
+        self._batch_started = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _remember(self, tx_hash: str, tx: Transaction):
+        self.known[tx_hash] = tx
+        self.known.move_to_end(tx_hash)
+        while len(self.known) > self.known_capacity:
+            self.known.popitem(last=False)
+
+    def queue_tx(self, tx: Transaction, tx_hash: Optional[str] = None) -> bool:
+        """Buffer a locally accepted tx for announcement (False if already seen)."""
+        tx_hash = tx_hash or tx.hash()
+        with self._lock:
+            if tx_hash in self.seen:
+                return False
+            self.seen.add(tx_hash)
+            full = self._enqueue(tx_hash, tx)
+        self._announce(full)
+        return True
+
+    def _enqueue(self, tx_hash: str, tx: Transaction) -> Optional[List[str]]:
+        """Add to the batch (lock held); returns the batch once it is full."""
+        self._remember(tx_hash, tx)
+        if not self._batch:
+            self._batch_started = time.monotonic()
+        self._batch.append(tx_hash)
+        self._batch_bytes += len(tx.wire_bytes())
+        if len(self._batch) >= self.max_batch_txs or self._batch_bytes >= self.max_batch_bytes:
+            return self._take_batch()
+        return None
+
+    def _take_batch(self) -> Optional[List[str]]:
+        if not self._batch:
+            return None
+        hashes, self._batch, self._batch_bytes = self._batch, [], 0
+        return hashes
+
+    def _announce(self, hashes: Optional[List[str]]):
+        # network I/O: never called with the lock held, so a slow peer stalls no one else
+        if hashes:
+            self.send("/tx_announce", {"hashes": hashes})
+
+    def flush(self):
+        with self._lock:
+            hashes = self._take_batch()
+        self._announce(hashes)
+
+    def poll(self):
+        """Flush the batch if it has waited ``max_delay`` (call periodically or ``start``)."""
+        with self._lock:
+            due = self._batch and time.monotonic() - self._batch_started >= self.max_delay
+            hashes = self._take_batch() if due else None
+        self._announce(hashes)
+
+    def on_announce(self, hashes: Sequence[str]) -> List[str]:
+        """Hashes worth fetching: not seen and not already requested elsewhere."""
+        now = time.monotonic()
+        missing = []
+        with self._lock:
+            for tx_hash in hashes:
+                if tx_hash in self.seen or self.requested.get(tx_hash, 0) > now:
+                    continue
+                self.requested[tx_hash] = now + self.fetch_timeout
+                missing.append(tx_hash)
+            if len(self.requested) > self.known_capacity:
+                self.requested = {h: t for h, t in self.requested.items() if t > now}
+        return missing
+
+    def serve_fetch(self, hashes: Sequence[str]) -> List[Dict]:
+        with self._lock:
+            return [self.known[h].to_json() for h in hashes if h in self.known]
+
+    def on_txs(self, payload: Sequence[Union[Dict, str, bytes]]) -> List[bool]:
+        """Admit a fetched batch; returns one result per tx (False for duplicates)."""
+        results = [False] * len(payload)
+        fresh: List[int] = []
+        txs: List[Transaction] = []
+        with self._lock:
+            for i, item in enumerate(payload):
+                try:
+                    tx = Transaction.from_json(item)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                tx_hash = tx.hash()
+                self.requested.pop(tx_hash, None)
+                if tx_hash in self.seen:
+                    self.duplicates += 1
+                    continue
+                fresh.append(i)
+                txs.append(tx)
+        if not txs:
+            return results
+        accepted = self.mempool.add_txs(txs, self.executor)
+        full: List[List[str]] = []
+        with self._lock:
+            for i, tx, ok in zip(fresh, txs, accepted):
+                results[i] = ok
+                if ok and tx.hash() not in self.seen:
+                    self.seen.add(tx.hash())
+                    batch = self._enqueue(tx.hash(), tx)
+                    if batch:
+                        full.append(batch)
+        for hashes in full:
+            self._announce(hashes)
+        return results
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tx-gossip", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.max_delay / 2):
+            self.poll()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
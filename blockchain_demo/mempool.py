@@ -1,47 +1,342 @@
-from typing import Dict, List, Optional, Set
+import os
+import time
+import heapq
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, List, Mapping, Optional, Tuple
 from .transaction import Transaction
 from . import dsl
 from .config import CFG
 
+# Below this many signatures a process pool costs more than it saves.
+PARALLEL_VERIFY_MIN_BATCH = 64
+
+
+def _verify_tx(tx: Transaction) -> bool:
+    return tx.verify()
+
+
 class Mempool:
-    def __init__(self, balances: Optional[Dict[str, int]] = None, mode: Optional[str] = None):
+    """Pending transactions ordered by premium (desc, then arrival) or FIFO.
+
+    ``txs`` maps each admitted tx hash to ``(seq, tx)``; the queue only holds
+    ``(key..., seq, tx_hash)`` entries. Removing a tx drops it from ``txs`` and
+    leaves a stale queue entry which is skipped (and eventually compacted)
+    when popping, so insertion, selection and removal stay logarithmic.
+
+    The pool is bounded by ``max_txs`` and ``max_bytes`` (wire size): past
+    either cap the lowest-premium txs are evicted (newest first among equal
+    premiums) through a min-heap kept the same way. Each sender may have at
+    most ``max_per_sender`` pending txs, entries older than ``ttl`` seconds
+    are swept in arrival order, and a tx with the same ``(from_addr, nonce)``
+    as a pending one replaces it if its premium is strictly higher.
+
+    ``balances`` is kept current with ``on_block_connected`` and
+    ``on_block_disconnected``, and a sender's pending premiums are reserved
+    against it (``pending_premium``) when admitting more of their txs.
+    """
+
+    def __init__(self, balances: Optional[Dict[str, int]] = None, mode: Optional[str] = None,
+                 max_txs: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_per_sender: Optional[int] = None, ttl: Optional[float] = None):
         self.mode = mode or CFG.TX_QUEUE_MODE
+        self.max_txs = max_txs or CFG.MEMPOOL_MAX_TXS
+        self.max_bytes = max_bytes or CFG.MEMPOOL_MAX_BYTES
+        self.max_per_sender = max_per_sender or CFG.MEMPOOL_MAX_PER_SENDER
+        self.ttl = ttl or CFG.MEMPOOL_TX_TTL
         self._seq = 0
-        self.txs: List[tuple[int, Transaction]] = []
-        self.tx_hashes: Set[str] = set()
+        self.txs: Dict[str, Tuple[int, Transaction]] = {}
+        self._heap: List[Tuple[int, int, str]] = []
+        self._fifo: Deque[Tuple[int, str]] = deque()
+        self._evict_heap: List[Tuple[int, int, str]] = []
+        self._expiry: Deque[Tuple[float, int, str]] = deque()
+        self.by_sender: Dict[str, Dict[int, str]] = {}
+        self.pending_premium: Dict[str, int] = {}
+        self.bytes = 0
+        self.counters = {"evicted": 0, "expired": 0, "replaced": 0}
         self.nonces: Dict[str, int] = {}
-        self.balances = balances or {}
+        self.balances: Dict[str, int] = dict(balances or {})
+
+    def __len__(self) -> int:
+        return len(self.txs)
+
+    def __contains__(self, tx_hash: str) -> bool:
+        return tx_hash in self.txs
+
+    @property
+    def tx_hashes(self):
+        return self.txs.keys()
 
     def add_tx(self, tx: Transaction) -> bool:
         # verify signature
         if not tx.verify():
             return False
-        # verify nonce monotonic per address
-        if tx.nonce <= self.nonces.get(tx.from_addr, 0):
-            return False
-        # verify balance sufficient for premium
-        if self.balances.get(tx.from_addr, 0) < tx.premium:
+        tx_hash = self._precheck(tx)
+        if tx_hash is None:
             return False
+        return self._admit(tx_hash, tx)
+
+    def _precheck(self, tx: Transaction) -> Optional[str]:
+        """Run every admission rule except the signature check.
+
+        Returns the tx hash when the tx is admissible, ``None`` otherwise.
+        """
+        pending = self.by_sender.get(tx.from_addr, {})
+        replaced = pending.get(tx.nonce)
+        if replaced is not None:
+            # replace-by-premium: same (from_addr, nonce), strictly higher premium
+            if tx.premium <= self.txs[replaced][1].premium:
+                return None
+        else:
+            # verify nonce monotonic per address
+            if tx.nonce <= self.nonces.get(tx.from_addr, 0):
+                return None
+            if len(pending) >= self.max_per_sender:
+                return None
+            # a full pool only takes txs that would not be evicted right away
+            lowest = self._lowest_premium()
+            if len(self.txs) >= self.max_txs and lowest is not None and tx.premium <= lowest:
+                return None
+        # verify balance sufficient for premium, on top of the sender's pending premiums
+        reserved = self.pending_premium.get(tx.from_addr, 0)
+        if replaced is not None:
+            reserved -= self.txs[replaced][1].premium
+        if self.balances.get(tx.from_addr, 0) - reserved < tx.premium:
+            return None
+        tx_hash = tx.hash()
+        if tx_hash in self.txs:
+            return None
         # pre-parse DSL script
         try:
-            dsl.parse_script(tx.script)
+            dsl.compile_script(tx.script)
         except Exception:
-            return False
-        tx_hash = tx.hash()
-        if tx_hash in self.tx_hashes:
-            return False
+            return None
+        return tx_hash
+
+    def add_txs(self, batch: Iterable[Transaction], executor: Optional[Executor] = None,
+                max_workers: Optional[int] = None) -> List[bool]:
+        """Admit a burst of transactions, verifying signatures in parallel.
+
+        Cheap rules (nonce, balance, duplicate hash, DSL syntax) are checked
+        first so rejected txs never reach the ECDSA check. Survivors are
+        verified on ``executor`` (a temporary process pool when omitted and the
+        batch is large enough) and then admitted in batch order, which gives
+        the same result as calling :meth:`add_tx` on each tx in turn.
+
+        Returns one boolean per transaction, ``True`` when it was admitted.
+        """
+        batch = list(batch)
+        results = [False] * len(batch)
+        candidates = [i for i, tx in enumerate(batch) if self._precheck(tx) is not None]
+        if not candidates:
+            return results
 
-        self.txs.append((self._seq, tx))
-        self.tx_hashes.add(tx_hash)
-        self.nonces[tx.from_addr] = tx.nonce
+        to_verify = [batch[i] for i in candidates]
+        if executor is not None:
+            verified = list(executor.map(_verify_tx, to_verify))
+        elif len(to_verify) < PARALLEL_VERIFY_MIN_BATCH or max_workers == 1:
+            verified = [_verify_tx(tx) for tx in to_verify]
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            chunksize = max(1, len(to_verify) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                verified = list(pool.map(_verify_tx, to_verify, chunksize=chunksize))
+
+        for i, ok in zip(candidates, verified):
+            if not ok:
+                continue
+            tx = batch[i]
+            # re-check against what earlier txs of this batch admitted
+            tx_hash = self._precheck(tx)
+            if tx_hash is None:
+                continue
+            results[i] = self._admit(tx_hash, tx)
+        return results
+
+    def _admit(self, tx_hash: str, tx: Transaction) -> bool:
+        """Insert a prechecked, verified tx; False if the caps would evict it at once.
+
+        Victims are chosen before anything changes, so a rejected tx leaves
+        the pool (including a tx it would have replaced) and the sender's
+        nonce untouched.
+        """
+        self.sweep()
+        replaced = self.by_sender.get(tx.from_addr, {}).get(tx.nonce)
+        count = len(self.txs) + 1
+        size = self.bytes + len(tx.wire_bytes())
+        if replaced is not None:
+            count -= 1
+            size -= len(self.txs[replaced][1].wire_bytes())
+        victims: List[Tuple[int, int, str]] = []
+        while count > self.max_txs or size > self.max_bytes:
+            if not self._evict_heap or self._evict_heap[0][0] >= tx.premium:
+                # the new tx is newer than any equal premium, so it would go first
+                for entry in victims:
+                    heapq.heappush(self._evict_heap, entry)
+                return False
+            entry = heapq.heappop(self._evict_heap)
+            _, neg_seq, victim = entry
+            if not self._is_live(-neg_seq, victim):
+                continue
+            victims.append(entry)
+            if victim != replaced:
+                count -= 1
+                size -= len(self.txs[victim][1].wire_bytes())
+        for _, _, victim in victims:
+            if victim != replaced:
+                self._discard(victim)
+                self.counters["evicted"] += 1
+        if replaced is not None:
+            self.remove_tx(replaced)
+            self.counters["replaced"] += 1
+        self._push(tx_hash, tx)
+        self.nonces[tx.from_addr] = max(tx.nonce, self.nonces.get(tx.from_addr, 0))
+        return True
+
+    def _push(self, tx_hash: str, tx: Transaction):
+        seq = self._seq
         self._seq += 1
+        self.txs[tx_hash] = (seq, tx)
         if self.mode == "premium":
-            self.txs.sort(key=lambda item: (-item[1].premium, item[0]))
-        return True
+            heapq.heappush(self._heap, (-tx.premium, seq, tx_hash))
+        else:
+            self._fifo.append((seq, tx_hash))
+        heapq.heappush(self._evict_heap, (tx.premium, -seq, tx_hash))
+        self._expiry.append((time.monotonic(), seq, tx_hash))
+        self.by_sender.setdefault(tx.from_addr, {})[tx.nonce] = tx_hash
+        self.pending_premium[tx.from_addr] = self.pending_premium.get(tx.from_addr, 0) + tx.premium
+        self.bytes += len(tx.wire_bytes())
+
+    def _discard(self, tx_hash: str) -> Optional[Transaction]:
+        entry = self.txs.pop(tx_hash, None)
+        if entry is None:
+            return None
+        tx = entry[1]
+        self.bytes -= len(tx.wire_bytes())
+        pending = self.by_sender[tx.from_addr]
+        del pending[tx.nonce]
+        if not pending:
+            del self.by_sender[tx.from_addr]
+            del self.pending_premium[tx.from_addr]
+        else:
+            self.pending_premium[tx.from_addr] -= tx.premium
+        return tx
+
+    def _lowest_premium(self) -> Optional[int]:
+        while self._evict_heap:
+            premium, neg_seq, tx_hash = self._evict_heap[0]
+            if self._is_live(-neg_seq, tx_hash):
+                return premium
+            heapq.heappop(self._evict_heap)
+        return None
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop txs older than ``ttl``; returns how many expired."""
+        deadline = (time.monotonic() if now is None else now) - self.ttl
+        expired = 0
+        while self._expiry and self._expiry[0][0] <= deadline:
+            _, seq, tx_hash = self._expiry.popleft()
+            if self._is_live(seq, tx_hash):
+                self._discard(tx_hash)
+                expired += 1
+        self.counters["expired"] += expired
+        return expired
+
+    def stats(self) -> Dict[str, int]:
+        return {"count": len(self.txs), "bytes": self.bytes, "senders": len(self.by_sender), **self.counters}
+
+    def _is_live(self, seq: int, tx_hash: str) -> bool:
+        entry = self.txs.get(tx_hash)
+        return entry is not None and entry[0] == seq
+
+    def _pop_next(self) -> Optional[Tuple[str, Transaction]]:
+        while self._heap or self._fifo:
+            if self.mode == "premium":
+                _, seq, tx_hash = heapq.heappop(self._heap)
+            else:
+                seq, tx_hash = self._fifo.popleft()
+            if self._is_live(seq, tx_hash):
+                return tx_hash, self._discard(tx_hash)  # type: ignore[return-value]
+        return None
+
+    def remove_tx(self, tx_hash: str) -> Optional[Transaction]:
+        tx = self._discard(tx_hash)
+        if tx is None:
+            return None
+        if len(self._evict_heap) > 2 * len(self.txs) + 64:
+            self._compact()
+        return tx
+
+    def _compact(self):
+        if self.mode == "premium":
+            self._heap = [e for e in self._heap if self._is_live(e[1], e[2])]
+            heapq.heapify(self._heap)
+        else:
+            self._fifo = deque(e for e in self._fifo if self._is_live(*e))
+        self._evict_heap = [e for e in self._evict_heap if self._is_live(-e[1], e[2])]
+        heapq.heapify(self._evict_heap)
+        self._expiry = deque(e for e in self._expiry if self._is_live(e[1], e[2]))
 
     def pop_for_block(self, cap: int) -> List[Transaction]:
-        selected_pairs = self.txs[:cap]
-        self.txs = self.txs[cap:]
-        for _, tx in selected_pairs:
-            self.tx_hashes.discard(tx.hash())
-        return [tx for _, tx in selected_pairs]
+        self.sweep()
+        selected: List[Transaction] = []
+        while len(selected) < cap:
+            item = self._pop_next()
+            if item is None:
+                break
+            selected.append(item[1])
+        return selected
+
+    @staticmethod
+    def _touched(block) -> set:
+        # finalization credits the miner and the frozen signers; senders pay premiums
+        return {block.header.miner, *block.signers_frozen, *(tx.from_addr for tx in block.transactions)}
+
+    def on_block_connected(self, block) -> int:
+        """Drop the block's txs (and pending txs they make stale) and update balances.
+
+        Costs O(k log n) for a block of k txs; returns how many pending txs
+        were removed.
+        """
+        removed = 0
+        chain_nonces: Dict[str, int] = {}
+        for tx in block.transactions:
+            chain_nonces[tx.from_addr] = max(tx.nonce, chain_nonces.get(tx.from_addr, 0))
+            if self.remove_tx(tx.hash()) is not None:
+                removed += 1
+        for sender, nonce in chain_nonces.items():
+            # same (from_addr, nonce) or lower: can no longer be included
+            stale = [h for n, h in self.by_sender.get(sender, {}).items() if n <= nonce]
+            for tx_hash in stale:
+                self.remove_tx(tx_hash)
+            removed += len(stale)
+            self.nonces[sender] = max(nonce, self.nonces.get(sender, 0))
+        for account in self._touched(block):
+            if account in block.balances:
+                self.balances[account] = block.balances[account]
+        return removed
+
+    def on_block_disconnected(self, block, parent_balances: Mapping[str, int]) -> int:
+        """Re-queue the txs of a block unwound by a reorg; returns how many were re-admitted.
+
+        ``parent_balances`` are the balances the chain falls back to (only
+        the accounts the block touched are read). Signatures are not checked
+        again: the txs were verified when the block was validated.
+        """
+        for account in self._touched(block):
+            if account in parent_balances:
+                self.balances[account] = parent_balances[account]
+            else:
+                self.balances.pop(account, None)
+        for tx in block.transactions:
+            self.nonces[tx.from_addr] = min(self.nonces.get(tx.from_addr, 0), tx.nonce - 1)
+        readmitted = 0
+        for tx in sorted(block.transactions, key=lambda t: (t.from_addr, t.nonce)):
+            tx_hash = self._precheck(tx)
+            if tx_hash is not None and self._admit(tx_hash, tx):
+                readmitted += 1
+        for tx in block.transactions:
+            pending = self.by_sender.get(tx.from_addr)
+            if pending:
+                self.nonces[tx.from_addr] = max(self.nonces[tx.from_addr], max(pending))
+        return readmitted
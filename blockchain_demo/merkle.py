@@ -0,0 +1,87 @@
+import json
+import hashlib
+from bisect import bisect_left
+from typing import List, Mapping, Sequence, Tuple
+
+# Domain separation keeps a leaf from ever being mistaken for an inner node.
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+# A proof is the list of siblings from leaf to root; "L"/"R" tells on which
+# side of the running hash the sibling sits.
+Proof = List[Tuple[str, str]]
+
+EMPTY_ROOT = hashlib.sha256(b"").hexdigest()
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(_LEAF + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE + left + right).digest()
+
+
+def entry_bytes(key: str, value) -> bytes:
+    """Leaf encoding of one ``key -> value`` entry of the state or balances."""
+    return json.dumps([key, value], separators=(",", ":")).encode()
+
+
+def mapping_leaves(mapping: Mapping[str, int]) -> Tuple[List[str], List[bytes]]:
+    keys = sorted(mapping)
+    return keys, [entry_bytes(k, mapping[k]) for k in keys]
+
+
+def _levels(leaves: Sequence[bytes]) -> List[List[bytes]]:
+    level = [leaf_hash(leaf) for leaf in leaves]
+    levels = [level]
+    while len(level) > 1:
+        # an odd last node is promoted unchanged rather than duplicated
+        nxt = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+        levels.append(level)
+    return levels
+
+
+def merkle_root(leaves: Sequence[bytes]) -> str:
+    if not leaves:
+        return EMPTY_ROOT
+    return _levels(leaves)[-1][0].hex()
+
+
+def merkle_proof(leaves: Sequence[bytes], index: int) -> Proof:
+    if not 0 <= index < len(leaves):
+        raise IndexError("leaf index out of range")
+    proof: Proof = []
+    for level in _levels(leaves)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("L" if sibling < index else "R", level[sibling].hex()))
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: Proof, root: str) -> bool:
+    current = leaf_hash(leaf)
+    for side, sibling_hex in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        current = node_hash(sibling, current) if side == "L" else node_hash(current, sibling)
+    return current.hex() == root
+
+
+def mapping_root(mapping: Mapping[str, int]) -> str:
+    return merkle_root(mapping_leaves(mapping)[1])
+
+
+def mapping_proof(mapping: Mapping[str, int], key: str) -> Proof:
+    keys, leaves = mapping_leaves(mapping)
+    index = bisect_left(keys, key)
+    if index == len(keys) or keys[index] != key:
+        raise KeyError(key)
+    return merkle_proof(leaves, index)
+
+
+def verify_entry(key: str, value, proof: Proof, root: str) -> bool:
+    return verify_proof(entry_bytes(key, value), proof, root)
@@ -0,0 +1,156 @@
+import os
+import hashlib
+import time
+import queue
+import multiprocessing
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Nonces tried between two checks of the stop flag / progress counter.
+CHECK_EVERY = 4096
+
+
+class PowTemplate:
+    """Canonical block bytes split around the header nonce.
+
+    The SHA-256 state after the fixed prefix is computed once; each nonce
+    attempt only copies that midstate and hashes the nonce digits plus the
+    suffix. ``digest(n)`` equals the double SHA-256 ``Block.hash()`` would
+    give with ``header.nonce == n``.
+    """
+
+    def __init__(self, prefix: bytes, suffix: bytes):
+        self.prefix = prefix
+        self.suffix = suffix
+        self._midstate = hashlib.sha256(prefix)
+
+    def digest(self, nonce: int) -> bytes:
+        inner = self._midstate.copy()
+        inner.update(b"%d" % nonce)
+        inner.update(self.suffix)
+        return hashlib.sha256(inner.digest()).digest()
+
+    def hash(self, nonce: int) -> str:
+        return self.digest(nonce).hex()
+
+
+@dataclass
+class MiningProgress:
+    hashes: int
+    elapsed: float
+
+    @property
+    def hashrate(self) -> float:
+        return self.hashes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class MiningResult(MiningProgress):
+    nonce: Optional[int] = None
+
+
+def search_nonce(template: PowTemplate, target: int, start: int = 0, step: int = 1,
+                 stop=None, on_batch: Optional[Callable[[int], None]] = None) -> Optional[int]:
+    """Try ``start, start + step, ...`` until a digest is below ``target``.
+
+    ``stop`` is any object with ``is_set()`` and is polled every
+    ``CHECK_EVERY`` attempts; ``on_batch`` receives the attempt count since
+    the previous call. Returns the winning nonce, or ``None`` when stopped.
+    """
+    nonce = start
+    while True:
+        for _ in range(CHECK_EVERY):
+            if int.from_bytes(template.digest(nonce), "big") < target:
+                if on_batch:
+                    on_batch((nonce - start) // step % CHECK_EVERY + 1)
+                return nonce
+            nonce += step
+        if on_batch:
+            on_batch(CHECK_EVERY)
+        if stop is not None and stop.is_set():
+            return None
+
+
+def _worker(prefix: bytes, suffix: bytes, target: int, start: int, step: int, stop, found, counter):
+    def count(n: int):
+        with counter.get_lock():
+            counter.value += n
+
+    nonce = search_nonce(PowTemplate(prefix, suffix), target, start, step, stop, count)
+    if nonce is not None:
+        found.put(nonce)
+        stop.set()
+
+
+def mine(template: PowTemplate, difficulty_bits: int, workers: Optional[int] = None, cancel=None,
+         progress: Optional[Callable[[MiningProgress], None]] = None,
+         report_interval: float = 1.0) -> MiningResult:
+    """Search for a nonce meeting ``difficulty_bits`` on ``workers`` cores.
+
+    Worker ``i`` tries nonces ``i, i + workers, ...``. Every worker stops as
+    soon as one finds a solution or ``cancel`` (a threading or multiprocessing
+    event) is set. ``progress`` is called every ``report_interval`` seconds.
+    With one worker the search runs in-process and returns the lowest valid
+    nonce, exactly like the historical sequential loop.
+    """
+    target = 2 ** (256 - difficulty_bits)
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+    if workers == 1:
+        return _mine_inline(template, target, cancel, progress, report_interval, started)
+
+    ctx = multiprocessing.get_context()
+    stop = ctx.Event()
+    found = ctx.Queue()
+    counter = ctx.Value("Q", 0)
+    procs = [
+        ctx.Process(target=_worker, args=(template.prefix, template.suffix, target, i, workers, stop, found, counter), daemon=True)
+        for i in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    nonce = None
+    try:
+        while nonce is None:
+            try:
+                nonce = found.get(timeout=report_interval)
+            except queue.Empty:
+                pass
+            if nonce is None and cancel is not None and cancel.is_set():
+                break
+            if nonce is None and not any(proc.is_alive() for proc in procs):
+                try:
+                    nonce = found.get(timeout=report_interval)
+                except queue.Empty:
+                    raise RuntimeError("all mining workers exited without a solution") from None
+            if progress:
+                progress(MiningProgress(counter.value, time.monotonic() - started))
+    finally:
+        stop.set()
+        # drain concurrent solutions so their workers can flush and exit
+        while True:
+            try:
+                found.get(timeout=0.05)
+            except queue.Empty:
+                break
+        for proc in procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+    return MiningResult(hashes=counter.value, elapsed=time.monotonic() - started, nonce=nonce)
+
+
+def _mine_inline(template, target, cancel, progress, report_interval, started) -> MiningResult:
+    hashes = 0
+    last_report = started
+
+    def count(n: int):
+        nonlocal hashes, last_report
+        hashes += n
+        now = time.monotonic()
+        if progress and now - last_report >= report_interval:
+            last_report = now
+            progress(MiningProgress(hashes, now - started))
+
+    nonce = search_nonce(template, target, stop=cancel, on_batch=count)
+    return MiningResult(hashes=hashes, elapsed=time.monotonic() - started, nonce=nonce)
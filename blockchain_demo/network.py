@@ -2,7 +2,10 @@ import os
 import json
 import requests
 import time
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from requests.adapters import HTTPAdapter
 from .wallet import verify
 
 
@@ -20,26 +23,132 @@ class PeerInfo:
         return f"http://{self.host}:{self.port}"
 
 
-def probe_peer(peer: PeerInfo, validator_set: List[str]):
+def probe_peer(peer: PeerInfo, validator_set: List[str], session=None, timeout: float = 2) -> bool:
+    http = session or requests
     start = time.time()
     try:
-        r = requests.get(peer.url + "/status", timeout=2)
+        r = http.get(peer.url + "/status", timeout=timeout)
         status = r.json()
         pubkey_claim = status.get("pubkey")
     except Exception:
-        return
+        return False
     latency = (time.time() - start) * 1000
     nonce = os.urandom(32).hex()
     try:
-        r = requests.post(peer.url + "/role_challenge", json={"nonce": nonce, "expect_validator": True}, timeout=2)
+        r = http.post(peer.url + "/role_challenge", json={"nonce": nonce, "expect_validator": True}, timeout=timeout)
         resp = r.json()
     except Exception:
-        return
+        return False
     pubkey = resp.get("pubkey", pubkey_claim)
     sig = resp.get("signature")
-    if sig and verify(pubkey, nonce, sig) and pubkey in validator_set:
-        peer.is_validator = True
+    peer.is_validator = bool(sig and verify(pubkey, nonce, sig) and pubkey in validator_set)
     peer.pubkey = pubkey
     peer.last_seen = time.time()
     peer.latency_ms = latency
+    return True
 
+
+def load_peers(path: str) -> List[PeerInfo]:
+    with open(path) as f:
+        data = json.load(f)
+    return [PeerInfo(p["host"], p["port"]) for p in data.get("peers", [])]
+
+
+def pooled_session(pool_size: int) -> requests.Session:
+    """``requests`` session reusing keep-alive connections across threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class PeerDiscovery:
+    """Probe every peer concurrently and keep the ``PeerInfo`` cache fresh.
+
+    Probes run on a bounded thread pool over one pooled keep-alive session,
+    each request bounded by ``timeout``. A peer that fails is retried after
+    ``retry_base * 2**(failures - 1)`` seconds (capped at ``retry_max``)
+    instead of on every pass. ``start`` re-probes every ``interval`` seconds
+    in a background thread; ``on_update(peer, ok)`` is called as each probe
+    completes.
+    """
+
+    def __init__(self, peers: List[PeerInfo], validator_set: List[str], max_workers: int = 16,
+                 timeout: float = 2.0, interval: float = 30.0, retry_base: float = 5.0,
+                 retry_max: float = 600.0, on_update: Optional[Callable[[PeerInfo, bool], None]] = None):
+        self.peers = peers
+        self.validator_set = validator_set
+        self.timeout = timeout
+        self.interval = interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.on_update = on_update
+        self.session = pooled_session(max_workers)
+        self.failures: Dict[str, int] = {}
+        self.next_probe: Dict[str, float] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _probe(self, peer: PeerInfo) -> bool:
+        return probe_peer(peer, self.validator_set, session=self.session, timeout=self.timeout)
+
+    def _record(self, peer: PeerInfo, ok: bool):
+        with self._lock:
+            if ok:
+                self.failures.pop(peer.url, None)
+                self.next_probe.pop(peer.url, None)
+            else:
+                failures = self.failures.get(peer.url, 0) + 1
+                self.failures[peer.url] = failures
+                delay = min(self.retry_max, self.retry_base * 2 ** (failures - 1))
+                self.next_probe[peer.url] = time.monotonic() + delay
+        if self.on_update:
+            self.on_update(peer, ok)
+
+    def due(self, peer: PeerInfo) -> bool:
+        with self._lock:
+            return time.monotonic() >= self.next_probe.get(peer.url, 0)
+
+    def probe_all(self, force: bool = False) -> Dict[str, bool]:
+        """Probe all due peers (all peers if ``force``) and wait for the results."""
+        futures = {
+            self._executor.submit(self._probe, peer): peer
+            for peer in self.peers
+            if force or self.due(peer)
+        }
+        results = {}
+        for future in as_completed(futures):
+            peer = futures[future]
+            ok = future.result()
+            self._record(peer, ok)
+            results[peer.url] = ok
+        return results
+
+    def validators(self) -> List[PeerInfo]:
+        return [p for p in self.peers if p.is_validator]
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="peer-discovery", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe_all()
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self._executor.shutdown(wait=True)
+        self.session.close()
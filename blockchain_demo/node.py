@@ -1,7 +1,10 @@
 import argparse
 import json
+import os
 import time
 from blockchain_demo.config import load_config, CFG
+from blockchain_demo.chainindex import ChainIndex
+from blockchain_demo.statedb import open_state
 
 
 def main():
@@ -13,12 +16,19 @@ def main():
     parser.add_argument('--wallet', required=True)
     args = parser.parse_args()
 
-    load_config(args.config)
+    cfg = load_config(args.config)
 
     with open(args.wallet) as f:
         wallet = json.load(f)
 
+    # fork choice state comes from the persistent index, not a scan of BLOCKS_DIR
+    chain_index = ChainIndex.load(os.path.join(cfg.DATA_DIR, cfg.CHAIN_INDEX_FILE))
+    state, balances = open_state(cfg)
+
     print(f"Starting {args.local_role} node with address {wallet['address']}")
+    if chain_index.best is not None:
+        print(f"Canonical tip {chain_index.tip} at height {chain_index.best.height}")
+    print(f"State ({cfg.STATE_BACKEND}): {len(state)} keys, {len(balances)} balances")
     try:
         while True:
             time.sleep(5)
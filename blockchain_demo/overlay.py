@@ -0,0 +1,64 @@
+from typing import Dict, Iterator, Mapping, Optional
+
+_MISSING = object()
+
+
+class StateOverlay(Mapping):
+    """Write journal layered over a read-only parent state.
+
+    Reads fall through to ``base`` unless the key was written; writes only
+    touch ``writes``. ``begin`` opens a per-transaction journal recording the
+    previous value of each key it overwrites, so a failed transaction can be
+    undone with ``rollback`` in O(keys written) without copying the state.
+    ``to_dict`` materialises the full post-state once, when the block is sealed.
+    """
+
+    def __init__(self, base: Mapping[str, int]):
+        self.base = base
+        self.writes: Dict[str, int] = {}
+        self._journal: Optional[Dict[str, object]] = None
+
+    def __getitem__(self, key: str) -> int:
+        if key in self.writes:
+            return self.writes[key]
+        return self.base[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.writes or key in self.base
+
+    def __setitem__(self, key: str, value: int):
+        if self._journal is not None and key not in self._journal:
+            self._journal[key] = self.writes.get(key, _MISSING)
+        self.writes[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        for key in self.writes:
+            if key not in self.base:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for key in self.writes if key not in self.base)
+
+    def begin(self):
+        if self._journal is not None:
+            raise RuntimeError("transaction already open")
+        self._journal = {}
+
+    def commit(self):
+        self._journal = None
+
+    def rollback(self):
+        if self._journal is None:
+            return
+        for key, previous in self._journal.items():
+            if previous is _MISSING:
+                del self.writes[key]
+            else:
+                self.writes[key] = previous  # type: ignore[assignment]
+        self._journal = None
+
+    def to_dict(self) -> Dict[str, int]:
+        state = dict(self.base.items())
+        state.update(self.writes)
+        return state
@@ -0,0 +1,105 @@
+import time
+import heapq
+from math import ceil
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .block import Block
+from .config import CFG
+from .wallet import verify
+
+
+class PendingEntry:
+    __slots__ = ("block_hash", "block", "deadline", "signers", "finalized")
+
+    def __init__(self, block_hash: str, block: Block, deadline: float):
+        self.block_hash = block_hash
+        self.block = block
+        self.deadline = deadline
+        self.signers: Set[str] = set()
+        self.finalized = False
+
+
+class PendingPool:
+    """Candidate blocks waiting for validator signatures (spec 5.6-5.10).
+
+    Candidates are indexed by their hash (the hash validators sign) and
+    expire ``ttl`` seconds after arrival through a min-heap of deadlines, so
+    ``expire`` only touches what is due. Each signature is verified once
+    (against the cached verifying keys of ``wallet``) and counted in a
+    per-block signer set, so quorum is detected in O(1) per signature:
+    ``on_finalize(block, signers)`` is called exactly once, when the first
+    quorum is reached. Signatures arriving later are still verified and
+    merged into ``validator_signatures`` until the entry expires, but do not
+    change the frozen signers.
+    """
+
+    def __init__(self, validator_set: Iterable[str], on_finalize: Optional[Callable[[Block, List[str]], None]] = None,
+                 ttl: Optional[float] = None, quorum_percent: Optional[int] = None):
+        self.validators = frozenset(validator_set)
+        self.on_finalize = on_finalize
+        self.ttl = ttl or CFG.BLOCK_CANDIDATE_TTL
+        self.quorum = ceil(len(self.validators) * (quorum_percent or CFG.QUORUM_PERCENT) / 100)
+        self.entries: Dict[str, PendingEntry] = {}
+        self._deadlines: List[Tuple[float, str]] = []
+        self.rejected = 0
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, block_hash: str) -> Optional[Block]:
+        entry = self.entries.get(block_hash)
+        return entry.block if entry else None
+
+    def signer_count(self, block_hash: str) -> int:
+        entry = self.entries.get(block_hash)
+        return len(entry.signers) if entry else 0
+
+    def add_candidate(self, block: Block, now: Optional[float] = None) -> str:
+        """Index a candidate (or merge a copy seen again) and count its signatures."""
+        block_hash = block.hash()
+        entry = self.entries.get(block_hash)
+        if entry is None:
+            now = time.monotonic() if now is None else now
+            entry = PendingEntry(block_hash, block, now + self.ttl)
+            self.entries[block_hash] = entry
+            heapq.heappush(self._deadlines, (entry.deadline, block_hash))
+            signatures = dict(block.validator_signatures)
+            block.validator_signatures = {}
+        else:
+            signatures = block.validator_signatures
+        for pubkey, signature in signatures.items():
+            self.add_signature(block_hash, pubkey, signature)
+        return block_hash
+
+    def add_signature(self, block_hash: str, pubkey: str, signature: str) -> bool:
+        """Verify and count one signature; ``False`` if unknown block or invalid."""
+        entry = self.entries.get(block_hash)
+        if entry is None or pubkey not in self.validators:
+            return False
+        if pubkey in entry.signers:
+            return True  # already verified for this block
+        if not verify(pubkey, block_hash, signature):
+            self.rejected += 1
+            return False
+        entry.block.validator_signatures[pubkey] = signature
+        entry.signers.add(pubkey)
+        if not entry.finalized and len(entry.signers) >= self.quorum:
+            entry.finalized = True
+            if self.on_finalize:
+                self.on_finalize(entry.block, sorted(entry.signers))
+        return True
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """Drop every candidate whose deadline has passed; returns their hashes."""
+        now = time.monotonic() if now is None else now
+        expired = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, block_hash = heapq.heappop(self._deadlines)
+            if self.entries.pop(block_hash, None) is not None:
+                expired.append(block_hash)
+        return expired
+
+    def next_deadline(self) -> Optional[float]:
+        return self._deadlines[0][0] if self._deadlines else None
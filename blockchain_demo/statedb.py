@@ -0,0 +1,211 @@
+import os
+import json
+import sqlite3
+import argparse
+from collections.abc import ItemsView
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+from .deltas import Delta
+
+STATE = "state"
+BALANCES = "balances"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    space TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (space, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS applied (
+    seq INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL UNIQUE,
+    height INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS undo (
+    block_hash TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    space TEXT NOT NULL,
+    key TEXT NOT NULL,
+    old_value INTEGER,
+    PRIMARY KEY (block_hash, seq)
+);
+"""
+
+
+class _Items(ItemsView):
+    def __iter__(self):
+        cursor = self._mapping._db.conn.execute(
+            "SELECT key, value FROM kv WHERE space = ? ORDER BY key", (self._mapping.space,)
+        )
+        return iter(cursor)
+
+
+class StateView(Mapping):
+    """Read-only mapping over one keyspace; each lookup is a single-key query.
+
+    Can be used directly as the parent state of ``StateOverlay`` (DSL
+    execution) or as ``parent_balances`` for ``Block.create_candidate`` and
+    ``Block.finalize``. ``items()`` (and so ``copy()``) reads the whole
+    keyspace in one query instead of one per key.
+    """
+
+    def __init__(self, db: "SQLiteStateStore", space: str):
+        self._db = db
+        self.space = space
+
+    def __getitem__(self, key: str) -> int:
+        row = self._db.conn.execute(
+            "SELECT value FROM kv WHERE space = ? AND key = ?", (self.space, key)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def __contains__(self, key) -> bool:
+        return self._db.conn.execute(
+            "SELECT 1 FROM kv WHERE space = ? AND key = ?", (self.space, key)
+        ).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        cursor = self._db.conn.execute("SELECT key FROM kv WHERE space = ? ORDER BY key", (self.space,))
+        return (row[0] for row in cursor)
+
+    def __len__(self) -> int:
+        return self._db.conn.execute("SELECT COUNT(*) FROM kv WHERE space = ?", (self.space,)).fetchone()[0]
+
+    def items(self) -> ItemsView:
+        return _Items(self)
+
+    def copy(self) -> Dict[str, int]:
+        return dict(self.items())
+
+
+class SQLiteStateStore:
+    """Live state and balances in SQLite (WAL), one transaction per block.
+
+    ``apply_block`` writes a block's deltas and the previous value of every
+    key it touches into an undo log, all in a single transaction; the most
+    recently applied block can then be undone with ``rollback_block`` on a
+    reorg.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.state = StateView(self, STATE)
+        self.balances = StateView(self, BALANCES)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tip(self) -> Optional[Tuple[str, int]]:
+        row = self.conn.execute("SELECT block_hash, height FROM applied ORDER BY seq DESC LIMIT 1").fetchone()
+        return (row[0], row[1]) if row else None
+
+    def load_snapshot(self, state: Mapping[str, int], balances: Mapping[str, int]):
+        """Replace the whole content (e.g. from genesis or JSON snapshots)."""
+        with self._transaction():
+            self.conn.execute("DELETE FROM kv")
+            self.conn.execute("DELETE FROM applied")
+            self.conn.execute("DELETE FROM undo")
+            self.conn.executemany("INSERT INTO kv VALUES (?, ?, ?)", [(STATE, k, v) for k, v in state.items()])
+            self.conn.executemany("INSERT INTO kv VALUES (?, ?, ?)", [(BALANCES, k, v) for k, v in balances.items()])
+
+    def apply_block(self, block_hash: str, height: int, state_delta: Delta, balances_delta: Delta):
+        with self._transaction():
+            self.conn.execute("INSERT INTO applied (block_hash, height) VALUES (?, ?)", (block_hash, height))
+            undo: List[Tuple] = []
+            for space, delta in ((STATE, state_delta), (BALANCES, balances_delta)):
+                keys = list(delta["set"]) + list(delta["del"])  # type: ignore[arg-type]
+                for key in keys:
+                    row = self.conn.execute("SELECT value FROM kv WHERE space = ? AND key = ?", (space, key)).fetchone()
+                    undo.append((block_hash, len(undo), space, key, row[0] if row else None))
+                self.conn.executemany(
+                    "INSERT INTO kv VALUES (?, ?, ?) ON CONFLICT(space, key) DO UPDATE SET value = excluded.value",
+                    [(space, k, v) for k, v in delta["set"].items()],  # type: ignore[union-attr]
+                )
+                self.conn.executemany("DELETE FROM kv WHERE space = ? AND key = ?", [(space, k) for k in delta["del"]])  # type: ignore[union-attr]
+            self.conn.executemany("INSERT INTO undo VALUES (?, ?, ?, ?, ?)", undo)
+
+    def rollback_block(self, block_hash: str):
+        tip = self.tip()
+        if tip is None or tip[0] != block_hash:
+            raise ValueError(f"{block_hash} is not the last applied block")
+        with self._transaction():
+            rows = self.conn.execute(
+                "SELECT space, key, old_value FROM undo WHERE block_hash = ? ORDER BY seq DESC", (block_hash,)
+            ).fetchall()
+            for space, key, old_value in rows:
+                if old_value is None:
+                    self.conn.execute("DELETE FROM kv WHERE space = ? AND key = ?", (space, key))
+                else:
+                    self.conn.execute(
+                        "INSERT INTO kv VALUES (?, ?, ?) ON CONFLICT(space, key) DO UPDATE SET value = excluded.value",
+                        (space, key, old_value),
+                    )
+            self.conn.execute("DELETE FROM undo WHERE block_hash = ?", (block_hash,))
+            self.conn.execute("DELETE FROM applied WHERE block_hash = ?", (block_hash,))
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _read_snapshot(path: str, key: str) -> Dict[str, int]:
+    with open(path) as fh:
+        data = json.load(fh)
+    return data.get(key, data) if isinstance(data, dict) else data
+
+
+def migrate_json_snapshots(state_path: str, balances_path: str, db_path: str) -> SQLiteStateStore:
+    """Load ``state.json``/``balances.json`` (as written by genesys.py) into SQLite."""
+    store = SQLiteStateStore(db_path)
+    store.load_snapshot(_read_snapshot(state_path, "state"), _read_snapshot(balances_path, "balances"))
+    return store
+
+
+def open_state(cfg) -> Tuple[Mapping[str, int], Mapping[str, int]]:
+    """Live state and balances for ``cfg.STATE_BACKEND``.
+
+    ``json`` reads ``STATE_FILE``/``BAL_FILE`` and ``sqlite`` opens
+    ``STATE_DB_FILE`` (both under ``DATA_DIR``); the SQLite views stay open
+    for the life of the process.
+    """
+    if cfg.STATE_BACKEND == "sqlite":
+        store = SQLiteStateStore(os.path.join(cfg.DATA_DIR, cfg.STATE_DB_FILE))
+        return store.state, store.balances
+    return (_read_snapshot(os.path.join(cfg.DATA_DIR, cfg.STATE_FILE), "state"),
+            _read_snapshot(os.path.join(cfg.DATA_DIR, cfg.BAL_FILE), "balances"))
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Migrate JSON state/balances snapshots to SQLite")
+    parser.add_argument("state_json")
+    parser.add_argument("balances_json")
+    parser.add_argument("db_path")
+    args = parser.parse_args(argv)
+    with migrate_json_snapshots(args.state_json, args.balances_json, args.db_path) as store:
+        print(f"migrated {len(store.state)} state keys and {len(store.balances)} balances into {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from math import ceil
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+from .block import Block, canonical_encode, sha256d
+from .executor import execute_block
+from .wallet import verify
+
+
+class SyncError(Exception):
+    """Raised when peers serve a chain that cannot be downloaded or validated."""
+
+
+@dataclass(frozen=True)
+class SyncProgress:
+    height: int
+    tip_hash: str
+    target_height: int
+    headers: int
+    blocks: int
+    elapsed: float
+
+    @property
+    def blocks_per_sec(self) -> float:
+        return self.blocks / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left at the current rate (``None`` before any block)."""
+        rate = self.blocks_per_sec
+        return (self.target_height - self.height) / rate if rate else None
+
+
+class HttpSyncSource:
+    """Sync source backed by a peer's ``/headers`` and ``/blocks`` endpoints.
+
+    A source is anything with ``headers(start, count)``, returning
+    ``[{"hash", "header"}]`` of the peer's canonical chain from height
+    ``start``, and ``blocks(hashes)``, returning ``Block.to_json()`` dicts.
+    """
+
+    def __init__(self, peer, session, timeout: float = 10.0):
+        self.peer = peer
+        self.session = session
+        self.timeout = timeout
+
+    def headers(self, start: int, count: int) -> List[Dict]:
+        r = self.session.get(self.peer.url + "/headers", params={"start": start, "count": count}, timeout=self.timeout)
+        return r.json()
+
+    def blocks(self, hashes: Sequence[str]) -> List[Dict]:
+        r = self.session.post(self.peer.url + "/blocks", json={"hashes": list(hashes)}, timeout=self.timeout)
+        return r.json()
+
+
+def load_progress(path: str) -> Optional[Tuple[str, int]]:
+    """Last ``(hash, height)`` applied by an interrupted sync, if any."""
+    try:
+        with open(path) as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return None
+    return data["hash"], data["height"]
+
+
+def save_progress(path: str, block_hash: str, height: int):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"hash": block_hash, "height": height}, fh)
+    os.replace(tmp, path)
+
+
+def check_block(block_json: Dict, expected_hash: str, parent_balances: Mapping[str, int],
+                difficulty_bits: int, validator_set: Sequence[str], quorum: int) -> Optional[str]:
+    """Checks that need no parent state: hash, roots, PoW and quorum signatures.
+
+    Runs in a worker process; returns why the block is invalid, or ``None``.
+    """
+    block = Block.from_json(block_json)
+    if block.hash() != expected_hash:
+        return "body does not match the announced hash"
+    if not block.finalized:
+        return "block is not finalized"
+    if not block.verify_commitments():
+        return "body does not match the header roots"
+    signed = block.candidate(parent_balances).hash()
+    if int(signed, 16) >= 2 ** (256 - difficulty_bits):
+        return "insufficient proof of work"
+    if len(set(block.signers_frozen)) < quorum:
+        return "quorum not reached"
+    for pubkey in block.signers_frozen:
+        sig = block.validator_signatures.get(pubkey)
+        if pubkey not in validator_set or not sig or not verify(pubkey, signed, sig):
+            return f"invalid signature from {pubkey[:16]}"
+    return None
+
+
+def replay_block(block: Block, state: Mapping[str, int], balances: Mapping[str, int], cfg,
+                 executor: Optional[Executor] = None) -> Optional[str]:
+    """Re-execute the DSL and finalization rewards on the parent state (spec 5.8).
+
+    Non-conflicting txs run in parallel on ``executor`` (see
+    :func:`executor.execute_block`); any failing tx rejects the block.
+    """
+    try:
+        _, overlay = execute_block(block.transactions, state, executor, strict=True)
+    except Exception as exc:
+        return f"script replay failed: {exc}"
+    if overlay.to_dict() != block.state:
+        return "state_post does not match the replay"
+    expected = dict(balances)
+    expected.update(block.balance_updates(block.signers_frozen, balances, cfg))
+    if expected != block.balances:
+        return "balances_post does not match the replay"
+    return None
+
+
+def _done(value) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+class ChainSync:
+    """Headers-first catch-up from several peers.
+
+    Headers are downloaded first from one source and checked for linkage
+    (and, for v2 blocks, their hash). Bodies are then fetched in chunks of
+    ``chunk_size`` from all sources in parallel, round-robin, keeping up to
+    ``window`` chunks in flight. Each block's stateless checks
+    (:func:`check_block`) run on a worker pool as soon as its body arrives,
+    while the main thread replays the DSL and balances in order
+    (:func:`replay_block`) for blocks whose checks are done, and hands each
+    valid block to ``on_block``.
+
+    With ``progress_path``, the last applied block is saved after every
+    chunk; ``load_progress`` gives the point to resume from, whose state the
+    caller restores from its own store (e.g. ``DeltaStore.get``).
+    """
+
+    def __init__(self, sources: Sequence, validator_set: Sequence[str], cfg,
+                 on_block: Optional[Callable[[Block], None]] = None, progress_path: Optional[str] = None,
+                 chunk_size: int = 64, header_batch: int = 2000, window: Optional[int] = None,
+                 executor: Optional[Executor] = None, workers: Optional[int] = None,
+                 progress: Optional[Callable[[SyncProgress], None]] = None):
+        if not sources:
+            raise ValueError("at least one sync source is required")
+        self.sources = list(sources)
+        self.validator_set = list(validator_set)
+        self.cfg = cfg
+        self.on_block = on_block
+        self.progress_path = progress_path
+        self.chunk_size = chunk_size
+        self.header_batch = header_batch
+        self.window = window or 2 * len(self.sources)
+        self.executor = executor
+        self.workers = workers
+        self.progress = progress
+        self.quorum = ceil(len(self.validator_set) * cfg.QUORUM_PERCENT / 100)
+
+    def fetch_headers(self, start_hash: str, start_height: int, target_height: Optional[int] = None) -> List[Dict]:
+        """Linked header entries after ``start_hash``, from the first source that answers."""
+        entries: List[Dict] = []
+        prev_hash, height = start_hash, start_height
+        source = 0
+        while target_height is None or height < target_height:
+            count = self.header_batch if target_height is None else min(self.header_batch, target_height - height)
+            try:
+                batch = self.sources[source].headers(height + 1, count)
+            except Exception:
+                source += 1
+                if source == len(self.sources):
+                    raise SyncError(f"no source served headers after height {height}")
+                continue
+            if not batch:
+                break
+            for entry in batch:
+                header = entry["header"]
+                if header["height"] != height + 1 or header["prev_hash"] != prev_hash:
+                    raise SyncError(f"header {entry['hash']} does not extend {prev_hash}")
+                if header.get("version", 1) >= 2 and sha256d(canonical_encode(header)) != entry["hash"]:
+                    raise SyncError(f"header {entry['hash']} does not match its hash")
+                entries.append(entry)
+                prev_hash, height = entry["hash"], height + 1
+        return entries
+
+    def _fetch_bodies(self, chunk: List[Dict], first_source: int) -> List[Dict]:
+        hashes = [entry["hash"] for entry in chunk]
+        for i in range(len(self.sources)):
+            source = self.sources[(first_source + i) % len(self.sources)]
+            try:
+                bodies = source.blocks(hashes)
+            except Exception:
+                continue
+            if len(bodies) == len(chunk) and all(b["header"] == e["header"] for b, e in zip(bodies, chunk)):
+                return bodies
+        raise SyncError(f"no source served the bodies from height {chunk[0]['header']['height']}")
+
+    def run(self, start_hash: str, start_height: int, state: Mapping[str, int], balances: Mapping[str, int],
+            target_height: Optional[int] = None) -> SyncProgress:
+        """Sync from ``start_hash`` (whose post-state is ``state``/``balances``)."""
+        started = time.monotonic()
+        entries = self.fetch_headers(start_hash, start_height, target_height)
+        target = start_height + len(entries)
+        chunks = [entries[i:i + self.chunk_size] for i in range(0, len(entries), self.chunk_size)]
+        tip_hash, height, applied = start_hash, start_height, 0
+
+        def report() -> SyncProgress:
+            return SyncProgress(height, tip_hash, target, len(entries), applied, time.monotonic() - started)
+
+        owned = None
+        executor = self.executor
+        if executor is None and self.workers != 1:
+            executor = owned = ProcessPoolExecutor(max_workers=self.workers or os.cpu_count() or 1)
+        downloads = ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix="sync-fetch")
+        try:
+            inflight: Deque[Future] = deque()
+            next_chunk = 0
+
+            def fill():
+                nonlocal next_chunk
+                while next_chunk < len(chunks) and len(inflight) < self.window:
+                    inflight.append(downloads.submit(self._fetch_bodies, chunks[next_chunk], next_chunk))
+                    next_chunk += 1
+
+            checks: Deque[Tuple[Block, Future]] = deque()
+            parent_balances: Mapping[str, int] = balances
+            for chunk in chunks:
+                fill()
+                bodies = inflight.popleft().result()
+                fill()
+                for entry, body in zip(chunk, bodies):
+                    args = (body, entry["hash"], parent_balances, self.cfg.DIFFICULTY_BITS, self.validator_set, self.quorum)
+                    future = executor.submit(check_block, *args) if executor else _done(check_block(*args))
+                    checks.append((Block.from_json(body), future))
+                    parent_balances = body["balances"]
+                # replay earlier chunks while this chunk's checks run
+                while len(checks) > len(chunk) or (next_chunk == len(chunks) and not inflight and checks):
+                    block, future = checks.popleft()
+                    error = future.result() or replay_block(block, state, balances, self.cfg, executor)
+                    if error:
+                        raise SyncError(f"block {block.hash()} at height {block.header.height}: {error}")
+                    if self.on_block:
+                        self.on_block(block)
+                    state, balances = block.state, block.balances
+                    tip_hash, height, applied = block.hash(), block.header.height, applied + 1
+                if self.progress_path and applied:
+                    save_progress(self.progress_path, tip_hash, height)
+                if self.progress:
+                    self.progress(report())
+        finally:
+            downloads.shutdown(wait=True, cancel_futures=True)
+            if owned is not None:
+                owned.shutdown()
+        return report()
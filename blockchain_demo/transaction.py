@@ -1,35 +1,66 @@
 import json
 import hashlib
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
 from . import wallet
 
+_SIGNATURE_FIELD = b',"signature":'
 
-@dataclass
+
+def _encode(data: Dict) -> bytes:
+    return json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+
+
+@dataclass(frozen=True, slots=True)
 class Transaction:
+    """Immutable transaction; the signature can be set once with ``sign``.
+
+    The canonical signing bytes, the tx hash and the canonical wire bytes
+    (signing fields + signature) are computed lazily and cached.
+    """
+
     from_addr: str
     script: str
     premium: int
     nonce: int
     signature: str = ""
+    _signing_bytes: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _wire: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def canonical_bytes(self) -> bytes:
+        if self._signing_bytes is None:
+            data = {
+                "from": self.from_addr,
+                "script": self.script,
+                "premium": self.premium,
+                "nonce": self.nonce,
+            }
+            object.__setattr__(self, "_signing_bytes", _encode(data))
+        return self._signing_bytes
 
     def canonical_json(self) -> str:
-        data = {
-            "from": self.from_addr,
-            "script": self.script,
-            "premium": self.premium,
-            "nonce": self.nonce,
-        }
-        return json.dumps(data, separators=(",", ":"), sort_keys=True)
+        return self.canonical_bytes().decode()
+
+    def wire_bytes(self) -> bytes:
+        """Canonical JSON of ``to_json()``, as sent over the network."""
+        if self._wire is None:
+            object.__setattr__(self, "_wire", _encode(self.to_json()))
+        return self._wire
 
     def hash(self) -> str:
-        return hashlib.sha256(self.canonical_json().encode()).hexdigest()
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hashlib.sha256(self.canonical_bytes()).hexdigest())
+        return self._hash
 
-    def sign(self, wallet_data: Dict[str, str]):
-        self.signature = wallet.sign(wallet_data, self.canonical_json())
+    def sign(self, wallet_data: Union[Dict[str, str], wallet.Wallet]):
+        if self.signature:
+            raise ValueError("transaction already signed")
+        object.__setattr__(self, "signature", wallet.sign(wallet_data, self.canonical_bytes()))
+        object.__setattr__(self, "_wire", None)
 
     def verify(self) -> bool:
-        return wallet.verify(self.from_addr, self.canonical_json(), self.signature)
+        return wallet.verify(self.from_addr, self.canonical_bytes(), self.signature)
 
     def to_json(self) -> Dict:
         return {
@@ -41,11 +72,29 @@ class Transaction:
         }
 
     @classmethod
-    def from_json(cls, data: Dict):
-        return cls(
+    def from_json(cls, data: Union[Dict, str, bytes], canonical: bool = False):
+        """Build a transaction from a dict or from raw JSON wire bytes.
+
+        With ``canonical=True`` the caller vouches that the raw bytes are
+        exactly ``wire_bytes()`` (e.g. they were stored by this node): they
+        are kept as the wire form and the signing bytes are sliced out of
+        them (``signature`` sorts last), without serializing anything again.
+        Bytes from peers must not be trusted this way.
+        """
+        raw = None
+        if isinstance(data, (str, bytes)):
+            raw = data.encode() if isinstance(data, str) else data
+            data = json.loads(raw)
+        tx = cls(
             from_addr=data["from"],
             script=data["script"],
             premium=data["premium"],
             nonce=data["nonce"],
             signature=data.get("signature", ""),
         )
+        if raw is not None and canonical:
+            end = raw.rfind(_SIGNATURE_FIELD)
+            if end != -1:
+                object.__setattr__(tx, "_wire", raw)
+                object.__setattr__(tx, "_signing_bytes", raw[:end] + b"}")
+        return tx
@@ -0,0 +1,205 @@
+import os
+import glob
+import json
+import sqlite3
+import argparse
+import queue
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .block import Block
+from .chainindex import ChainIndex
+from . import config
+from .statedb import _Transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS txs (
+    tx_hash TEXT PRIMARY KEY,
+    block_hash TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS txs_block ON txs (block_hash);
+CREATE TABLE IF NOT EXISTS address_txs (
+    address TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    block_hash TEXT NOT NULL,
+    PRIMARY KEY (address, height, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS address_txs_block ON address_txs (block_hash);
+CREATE TABLE IF NOT EXISTS balance_history (
+    address TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    balance INTEGER NOT NULL,
+    PRIMARY KEY (address, height)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS balance_history_block ON balance_history (block_hash);
+"""
+
+
+class TxRef(NamedTuple):
+    tx_hash: str
+    block_hash: str
+    height: int
+    position: int
+
+
+class BalanceEntry(NamedTuple):
+    height: int
+    block_hash: str
+    balance: int
+
+
+class ExplorerIndex:
+    """SQLite indexes behind ``/tx/<hash>`` and ``/address/<pubkey>`` (spec 6.2).
+
+    * tx hash -> (block, position)
+    * address -> its txs, ordered by (height, position)
+    * address -> balance after every block that changed it
+
+    ``connect_block`` is called when a block joins the canonical chain and
+    ``disconnect_block`` when a reorg unwinds it; each touches only that
+    block's rows, and every lookup is a primary-key seek, independent of
+    chain length. ``rebuild`` (the ``reindex`` command) recreates everything
+    from the canonical chain. Queries borrow a connection from a small pool
+    (``pool_size`` idle connections at most), so the index can back a
+    threaded HTTP server without one connection per request thread.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        self._closed = False
+        with self._checkout() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _open(self) -> sqlite3.Connection:
+        # pooled connections move between the explorer's request threads
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _checkout(self) -> Iterator[sqlite3.Connection]:
+        """Borrow an idle connection (or open one); at most ``pool_size`` are kept."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            try:
+                if self._closed:
+                    raise queue.Full
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self, conn: sqlite3.Connection, block: Block):
+        block_hash, height = block.hash(), block.header.height
+        rows = [(tx.hash(), block_hash, height, i) for i, tx in enumerate(block.transactions)]
+        conn.executemany("INSERT OR REPLACE INTO txs VALUES (?, ?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT OR REPLACE INTO address_txs VALUES (?, ?, ?, ?, ?)",
+            [(tx.from_addr, height, i, tx.hash(), block_hash) for i, tx in enumerate(block.transactions)],
+        )
+        # only the miner, the frozen signers and the senders can change balance
+        touched = {block.header.miner, *block.signers_frozen, *(tx.from_addr for tx in block.transactions)}
+        conn.executemany(
+            "INSERT OR REPLACE INTO balance_history VALUES (?, ?, ?, ?)",
+            [(a, height, block_hash, block.balances[a]) for a in sorted(touched) if a in block.balances],
+        )
+
+    def connect_block(self, block: Block):
+        with self._checkout() as conn, _Transaction(conn):
+            self._connect(conn, block)
+
+    def disconnect_block(self, block_hash: str):
+        with self._checkout() as conn, _Transaction(conn):
+            for table in ("txs", "address_txs", "balance_history"):
+                conn.execute(f"DELETE FROM {table} WHERE block_hash = ?", (block_hash,))
+
+    def rebuild(self, blocks: Iterable[Block]) -> int:
+        """Drop every row and index ``blocks`` (the canonical chain, in order)."""
+        count = 0
+        with self._checkout() as conn, _Transaction(conn):
+            for table in ("txs", "address_txs", "balance_history"):
+                conn.execute(f"DELETE FROM {table}")
+            for block in blocks:
+                self._connect(conn, block)
+                count += 1
+        return count
+
+    def tx(self, tx_hash: str) -> Optional[TxRef]:
+        with self._checkout() as conn:
+            row = conn.execute(
+                "SELECT tx_hash, block_hash, height, position FROM txs WHERE tx_hash = ?", (tx_hash,)
+            ).fetchone()
+        return TxRef(*row) if row else None
+
+    def address_txs(self, address: str, after: Optional[Tuple[int, int]] = None,
+                    limit: Optional[int] = None) -> List[TxRef]:
+        """Txs sent by ``address`` in chain order, starting after ``(height, position)``."""
+        height, position = after if after is not None else (-1, -1)
+        with self._checkout() as conn:
+            rows = conn.execute(
+                "SELECT tx_hash, block_hash, height, position FROM address_txs"
+                " WHERE address = ? AND (height, position) > (?, ?) ORDER BY height, position LIMIT ?",
+                (address, height, position, -1 if limit is None else limit),
+            ).fetchall()
+        return [TxRef(*row) for row in rows]
+
+    def balance_history(self, address: str) -> List[BalanceEntry]:
+        with self._checkout() as conn:
+            rows = conn.execute(
+                "SELECT height, block_hash, balance FROM balance_history WHERE address = ? ORDER BY height", (address,)
+            ).fetchall()
+        return [BalanceEntry(*row) for row in rows]
+
+
+def canonical_blocks(blocks_dir: str) -> List[Block]:
+    """Load ``<hash>.json`` blocks and return the best finalized chain in order."""
+    blocks: Dict[str, Dict] = {}
+    for path in glob.glob(os.path.join(blocks_dir, "*.json")):
+        with open(path) as fh:
+            data = json.load(fh)
+        data.setdefault("hash", os.path.basename(path)[:-len(".json")])
+        blocks[data["hash"]] = data
+    index = ChainIndex()
+    for data in sorted(blocks.values(), key=lambda b: b["header"]["height"]):
+        index.add_block(data)
+    if index.tip is None:
+        return []
+    return [Block.from_json(blocks[h]) for h in index.chain()]
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Rebuild the explorer tx/address indexes (reindex)")
+    parser.add_argument("blocks_dir", nargs="?", default=config.CFG.BLOCKS_DIR)
+    parser.add_argument("db_path", nargs="?", default=os.path.join(config.CFG.DATA_DIR, config.CFG.EXPLORER_INDEX_FILE))
+    args = parser.parse_args(argv)
+    with ExplorerIndex(args.db_path) as index:
+        count = index.rebuild(canonical_blocks(args.blocks_dir))
+    print(f"indexed {count} blocks into {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
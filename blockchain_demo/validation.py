@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterator, Mapping, Optional, Tuple
+from .block import Block
+from .executor import execute_block
+
+Loader = Callable[[str], Tuple[Mapping[str, int], Mapping[str, int]]]
+
+
+class ValidationError(Exception):
+    """Raised when a block's declared post-state does not match its execution."""
+
+
+class Layer(Mapping):
+    """Immutable post-state: one block's ``writes`` over its parent's layer.
+
+    Sibling forks share their common parent layers instead of copying the
+    state. Once a chain of layers reaches ``max_depth``, the new layer is
+    flattened into a plain dict so lookups stay bounded.
+    """
+
+    __slots__ = ("parent", "writes", "depth", "_len")
+
+    def __init__(self, parent: Mapping[str, int], writes: Mapping[str, int], max_depth: int = 32):
+        depth = parent.depth + 1 if isinstance(parent, Layer) else 1
+        new_keys = sum(1 for key in writes if key not in parent)
+        self._len = len(parent) + new_keys
+        if depth > max_depth:
+            flat = dict(parent)
+            flat.update(writes)
+            parent, writes, depth = {}, flat, 1
+        self.parent = parent
+        self.writes = dict(writes)
+        self.depth = depth
+
+    def __getitem__(self, key: str) -> int:
+        layer: Mapping[str, int] = self
+        while isinstance(layer, Layer):
+            if key in layer.writes:
+                return layer.writes[key]
+            layer = layer.parent
+        return layer[key]
+
+    def __contains__(self, key) -> bool:
+        layer: Mapping[str, int] = self
+        while isinstance(layer, Layer):
+            if key in layer.writes:
+                return True
+            layer = layer.parent
+        return key in layer
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        layer: Mapping[str, int] = self
+        while isinstance(layer, Layer):
+            for key in layer.writes:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+            layer = layer.parent
+        for key in layer:
+            if key not in seen:
+                yield key
+
+    def __len__(self) -> int:
+        return self._len
+
+
+def _check(name: str, declared: Mapping[str, int], parent: Mapping[str, int], writes: Mapping[str, int],
+           full_check: bool):
+    for key, value in writes.items():
+        if declared.get(key) != value:
+            raise ValidationError(f"{name}[{key}] is {declared.get(key)}, expected {value}")
+    expected_len = len(parent) + sum(1 for key in writes if key not in parent)
+    if len(declared) != expected_len:
+        raise ValidationError(f"{name} has {len(declared)} keys, expected {expected_len}")
+    if full_check:
+        for key, value in declared.items():
+            if key not in writes and parent.get(key) != value:
+                raise ValidationError(f"{name}[{key}] changed without being written")
+
+
+class ValidationEngine:
+    """Validate blocks against cached parent post-states (spec 5.8 replay).
+
+    Post-states of the last ``max_entries`` validated blocks are kept as
+    :class:`Layer` pairs, so a block is checked by running its transactions
+    over its parent's layer, without copying the parent state. The declared
+    ``state``/``balances`` are then compared key by key against the layer
+    plus the writes. ``full_check=False`` only compares the written keys and
+    the map sizes, in O(block size); it does not bind untouched keys, so it
+    is only meant for trusted input (e.g. blocks this node built itself).
+    On a cache miss, the parent post-state is
+    rebuilt with ``loader`` (e.g. ``DeltaStore.get``, which replays from the
+    nearest checkpoint). With ``executor``, non-conflicting txs are replayed
+    in parallel (:func:`executor.execute_block`). PoW and signatures are
+    checked separately (``sync.check_block``).
+    """
+
+    def __init__(self, cfg, loader: Optional[Loader] = None, max_entries: int = 64, max_depth: int = 32,
+                 full_check: bool = True, executor: Optional[Executor] = None):
+        self.cfg = cfg
+        self.executor = executor
+        self.loader = loader
+        self.max_entries = max_entries
+        self.max_depth = max_depth
+        self.full_check = full_check
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, Tuple[Mapping[str, int], Mapping[str, int]]]" = OrderedDict()
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self._cache
+
+    def add(self, block_hash: str, state: Mapping[str, int], balances: Mapping[str, int]):
+        """Seed the cache with a known post-state (genesis, or the current tip)."""
+        self._cache[block_hash] = (state, balances)
+        self._cache.move_to_end(block_hash)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def post_state(self, block_hash: str) -> Tuple[Mapping[str, int], Mapping[str, int]]:
+        entry = self._cache.get(block_hash)
+        if entry is not None:
+            self.hits += 1
+            self._cache.move_to_end(block_hash)
+            return entry
+        self.misses += 1
+        if self.loader is None:
+            raise ValidationError(f"unknown parent state {block_hash}")
+        try:
+            entry = self.loader(block_hash)
+        except KeyError:
+            raise ValidationError(f"unknown parent state {block_hash}") from None
+        self.add(block_hash, *entry)
+        return entry
+
+    def validate(self, block: Block) -> Tuple[Mapping[str, int], Mapping[str, int]]:
+        """Check ``block`` against its parent and cache its post-state.
+
+        Returns the post ``(state, balances)`` layers; raises
+        :class:`ValidationError` if the declared maps are wrong.
+        """
+        parent_state, parent_balances = self.post_state(block.header.prev_hash)
+        try:
+            _, overlay = execute_block(block.transactions, parent_state, self.executor, strict=True)
+        except Exception as exc:
+            raise ValidationError(f"script replay failed: {exc}") from exc
+        updates = block.balance_updates(block.signers_frozen, parent_balances, self.cfg)
+        _check("state", block.state, parent_state, overlay.writes, self.full_check)
+        _check("balances", block.balances, parent_balances, updates, self.full_check)
+        post = (Layer(parent_state, overlay.writes, self.max_depth), Layer(parent_balances, updates, self.max_depth))
+        self.add(block.hash(), *post)
+        return post
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
@@ -1,7 +1,15 @@
 import os
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Union
 from ecdsa import SigningKey, VerifyingKey, SECP256k1
+from ecdsa.ellipticcurve import PointJacobi
+
+# Parsed keys are kept in bounded LRU caches: validators and heavy senders
+# verify against the same few pubkeys over and over.
+VERIFYING_KEY_CACHE_SIZE = 1024
+SIGNING_KEY_CACHE_SIZE = 64
 
 
 def generate_wallet(path: str, local_role: str = "miner"):
@@ -24,14 +32,90 @@ def load_wallet(path: str):
         return json.load(f)
 
 
-def sign(wallet, message: str) -> str:
-    sk = SigningKey.from_string(bytes.fromhex(wallet['private_key']), curve=SECP256k1)
-    return sk.sign(message.encode()).hex()
+@lru_cache(maxsize=VERIFYING_KEY_CACHE_SIZE)
+def verifying_key(pubkey: str) -> VerifyingKey:
+    """Parse ``pubkey`` once and precompute its scalar multiplication tables."""
+    vk = VerifyingKey.from_string(bytes.fromhex(pubkey), curve=SECP256k1)
+    # ``VerifyingKey.precompute`` needs the point order, which ``from_string``
+    # does not record, so rebuild the (already validated) point with it.
+    point = vk.pubkey.point
+    table_point = PointJacobi(point.curve(), point.x(), point.y(), 1, SECP256k1.order, generator=True)
+    return VerifyingKey.from_public_point(table_point, curve=SECP256k1, validate_point=False)
+
+
+@lru_cache(maxsize=SIGNING_KEY_CACHE_SIZE)
+def signing_key(private_key: str) -> SigningKey:
+    return SigningKey.from_string(bytes.fromhex(private_key), curve=SECP256k1)
+
+
+def key_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Return hits, misses, size and hit rate of both key caches."""
+    stats = {}
+    for name, cached in (("verifying", verifying_key), ("signing", signing_key)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+        }
+    return stats
+
+
+def clear_key_caches():
+    verifying_key.cache_clear()
+    signing_key.cache_clear()
+
+
+@dataclass
+class Wallet:
+    """Wallet holding its parsed signing key for repeated signatures.
+
+    Accepted anywhere a wallet dict is (``wallet.sign``, ``Transaction.sign``).
+    """
+
+    public_key: str
+    private_key: str
+    address: str
+    last_nonce: int = 0
+    local_role: str = "miner"
+    signing_key: SigningKey = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.signing_key = SigningKey.from_string(bytes.fromhex(self.private_key), curve=SECP256k1)
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(
+            public_key=data["public_key"],
+            private_key=data["private_key"],
+            address=data.get("address", data["public_key"]),
+            last_nonce=data.get("last_nonce", 0),
+            local_role=data.get("local_role", "miner"),
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        return cls.from_dict(load_wallet(path))
+
+    def sign(self, message: Union[str, bytes]) -> str:
+        return self.signing_key.sign(_as_bytes(message)).hex()
+
+
+def _as_bytes(message: Union[str, bytes]) -> bytes:
+    return message.encode() if isinstance(message, str) else message
+
+
+def sign(wallet, message: Union[str, bytes]) -> str:
+    if isinstance(wallet, Wallet):
+        return wallet.sign(message)
+    return signing_key(wallet['private_key']).sign(_as_bytes(message)).hex()
 
 
-def verify(pubkey: str, message: str, signature: str) -> bool:
+def verify(pubkey: str, message: Union[str, bytes], signature: str) -> bool:
     try:
-        vk = VerifyingKey.from_string(bytes.fromhex(pubkey), curve=SECP256k1)
-        return vk.verify(bytes.fromhex(signature), message.encode())
+        vk = verifying_key(pubkey)
+        return vk.verify(bytes.fromhex(signature), _as_bytes(message))
     except Exception:
         return False
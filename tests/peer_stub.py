@@ -0,0 +1,69 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PeerStub:
+    """In-process HTTP stand-in for a node.
+
+    ``routes`` maps ``"GET /path"`` / ``"POST /path"`` to a callable taking the
+    decoded JSON body (``None`` for GET) and returning a JSON-able response.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                key = f"{method} {self.path}"
+                stub.requests.append((key, body))
+                handler = stub.routes.get(key)
+                if handler is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                payload = json.dumps(handler(body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def node_routes(w):
+    """``/status`` and ``/role_challenge`` answered with wallet ``w``."""
+    from blockchain_demo import wallet
+
+    return {
+        "GET /status": lambda _: {"pubkey": w["public_key"], "supports_validation": True},
+        "POST /role_challenge": lambda body: {"pubkey": w["public_key"], "signature": wallet.sign(w, body["nonce"])},
+    }
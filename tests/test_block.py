@@ -0,0 +1,104 @@
+import os
+from blockchain_demo.block import Block
+from blockchain_demo.transaction import Transaction
+from blockchain_demo import wallet
+
+
+def create_wallet(tmp_path, name='w.json'):
+    return wallet.generate_wallet(os.path.join(tmp_path, name), local_role='user')
+
+
+def signed_tx(w, script, nonce, premium=1):
+    tx = Transaction(from_addr=w['public_key'], script=script, premium=premium, nonce=nonce)
+    tx.sign(w)
+    return tx
+
+
+def test_create_candidate_excludes_failed_scripts(tmp_path):
+    w = create_wallet(tmp_path)
+    parent_state = {"counter": 0}
+    txs = [
+        signed_tx(w, "let counter = counter + 1", 1),
+        signed_tx(w, "let counter = counter + 10; let y = missing + 1", 2),
+        signed_tx(w, "let counter = counter + 1", 3),
+    ]
+    block = Block.create_candidate("0" * 64, 1, "miner", txs, parent_state, {w['public_key']: 10})
+    assert block.state == {"counter": 2}
+    assert block.transactions == (txs[0], txs[2])
+    assert parent_state == {"counter": 0}
+
+
+def test_pow_template_matches_block_hash(tmp_path):
+    w = create_wallet(tmp_path)
+    txs = [signed_tx(w, "let nonce = 1", 1)]
+    block = Block.create_candidate("0" * 64, 1, "miner", txs, {"a": 1}, {w['public_key']: 3, "nonce": 1})
+    template = block.pow_template()
+    for nonce in (0, 7, 123456789):
+        block.header = block.header.with_nonce(nonce)
+        assert template.hash(nonce) == block.hash()
+
+
+def test_proof_of_work_finds_lowest_valid_nonce():
+    block = Block.create_candidate("0" * 64, 1, "miner", [], {"a": 1}, {})
+    block.proof_of_work(8)
+    found = block.header.nonce
+    assert int(block.hash(), 16) < 2 ** (256 - 8)
+    for nonce in range(found):
+        block.header = block.header.with_nonce(nonce)
+        assert int(block.hash(), 16) >= 2 ** (256 - 8)
+
+
+def test_block_hash_is_memoised_and_invalidated():
+    import dataclasses
+    import pytest
+    from blockchain_demo import block as block_mod
+
+    block = Block.create_candidate("0" * 64, 1, "miner", [], {"a": 1}, {"x": 1})
+    block_mod.reset_hash_stats()
+    first = block.hash()
+    for _ in range(5):
+        assert block.hash() == first
+    block.to_json()
+    assert block_mod.hash_stats()["recomputations"] == 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        block.header.nonce = 1
+    block.header = block.header.with_nonce(1)
+    assert block.hash() != first
+    block.balances = {"x": 2}
+    block.hash()
+    assert block_mod.hash_stats()["recomputations"] == 3
+
+
+def test_v2_block_commits_body_in_header(tmp_path):
+    from blockchain_demo import merkle
+
+    w = create_wallet(tmp_path)
+    txs = [signed_tx(w, "let a = a + 1", 1), signed_tx(w, "let b = 2", 2)]
+    block = Block.create_candidate("0" * 64, 1, "miner", txs, {"a": 1}, {w['public_key']: 9}, version=2)
+    assert block.verify_commitments()
+    assert block.hashed_dict() == block.header.to_dict()
+    header = block.header
+    assert merkle.verify_proof(txs[1].wire_bytes(), block.tx_proof(1), header.tx_root)
+    assert merkle.verify_entry("a", 2, block.state_proof("a"), header.state_root)
+    assert merkle.verify_entry(w['public_key'], 9, block.balance_proof(w['public_key']), header.balances_root)
+
+    block.proof_of_work(6)
+    assert int(block.hash(), 16) < 2 ** (256 - 6)
+    assert block.pow_template().hash(block.header.nonce) == block.hash()
+
+    restored = Block.from_json(block.to_json())
+    assert restored.hash() == block.hash()
+    restored.state = {"a": 99, "b": 2}
+    assert not restored.verify_commitments()
+
+
+def test_v1_blocks_keep_their_hash_format(tmp_path):
+    from blockchain_demo.block import canonical_encode, sha256d
+
+    w = create_wallet(tmp_path)
+    block = Block.create_candidate("0" * 64, 1, "miner", [signed_tx(w, "let a = 1", 1)], {}, {"x": 1})
+    assert "version" not in block.header.to_dict()
+    assert block.hash() == sha256d(canonical_encode(block.canonical_dict()))
+    restored = Block.from_json(block.to_json())
+    assert restored.hash() == block.to_json()["hash"]
+    assert restored.verify_commitments()
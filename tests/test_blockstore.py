@@ -0,0 +1,68 @@
+import os
+import json
+from blockchain_demo.block import Block
+from blockchain_demo.blockstore import BlockStore, import_block_dir
+from blockchain_demo.config import Config
+from blockchain_demo import config
+
+
+def make_blocks(count):
+    blocks = []
+    prev = "0" * 64
+    for height in range(1, count + 1):
+        block = Block.create_candidate(prev, height, "miner", [], {"h": height}, {"m": height})
+        data = block.to_json()
+        blocks.append(data)
+        prev = data["hash"]
+    return blocks
+
+
+def test_put_get_and_segment_rollover(tmp_path):
+    blocks = make_blocks(6)
+    with BlockStore(str(tmp_path), segment_max_bytes=600) as store:
+        for data in blocks:
+            assert store.put(data)
+        assert not store.put(blocks[0])
+        assert store.get(blocks[3]["hash"]) == blocks[3]
+    assert len([p for p in os.listdir(tmp_path) if p.startswith("segment-")]) > 1
+    with BlockStore(str(tmp_path), segment_max_bytes=600) as reopened:
+        assert len(reopened) == 6
+        for data in blocks:
+            assert reopened.get(data["hash"]) == data
+
+
+def test_segment_size_defaults_to_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CFG", Config(BLOCK_SEGMENT_BYTES=600))
+    with BlockStore(str(tmp_path)) as store:
+        assert store.segment_max_bytes == 600
+        for data in make_blocks(6):
+            store.put(data)
+    assert len([p for p in os.listdir(tmp_path) if p.startswith("segment-")]) > 1
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    blocks = make_blocks(3)
+    with BlockStore(str(tmp_path)) as store:
+        for data in blocks:
+            store.put(data)
+        _, offset, length = store.index[blocks[2]["hash"]]
+    segment = tmp_path / "segment-000000.dat"
+    with open(segment, "r+b") as fh:
+        fh.truncate(offset + length // 2)
+    with BlockStore(str(tmp_path)) as store:
+        assert blocks[2]["hash"] not in store
+        assert len(store) == 2
+        assert store.put(blocks[2])
+        assert store.get(blocks[2]["hash"]) == blocks[2]
+
+
+def test_import_legacy_block_dir(tmp_path):
+    legacy = tmp_path / "blocks"
+    legacy.mkdir()
+    blocks = make_blocks(3)
+    for data in blocks:
+        (legacy / f"{data['hash']}.json").write_text(json.dumps(data, indent=2))
+    with BlockStore(str(tmp_path / "store")) as store:
+        assert import_block_dir(str(legacy), store) == 3
+        assert import_block_dir(str(legacy), store) == 0
+        assert [store.get(h)["header"]["height"] for h in store.hashes()] == [1, 2, 3]
@@ -0,0 +1,57 @@
+import os
+import time
+import threading
+from blockchain_demo import wallet
+from blockchain_demo.broadcast import Broadcaster, rank_by_latency
+from blockchain_demo.network import PeerInfo
+from tests.peer_stub import PeerStub
+
+
+def signing_routes(w, block_hash, delay=0.0):
+    def propose(body):
+        time.sleep(delay)
+        return {"pubkey": w["public_key"], "signature": wallet.sign(w, block_hash)}
+    return {"POST /block_proposal": propose}
+
+
+def as_validator(stub, w, latency):
+    peer = PeerInfo("127.0.0.1", stub.port)
+    peer.pubkey, peer.is_validator, peer.latency_ms = w["public_key"], True, latency
+    return peer
+
+
+def test_rank_by_latency_puts_unprobed_last():
+    a, b, c = PeerInfo("a", 1), PeerInfo("b", 2), PeerInfo("c", 3)
+    a.latency_ms, b.latency_ms, c.latency_ms = 30.0, 0.0, 5.0
+    assert rank_by_latency([a, b, c]) == [c, a, b]
+
+
+def test_propose_block_stops_at_quorum(tmp_path):
+    block_hash = "ab" * 32
+    ws = [wallet.generate_wallet(os.path.join(tmp_path, f'v{i}.json'), local_role='validator') for i in range(3)]
+    with PeerStub(signing_routes(ws[0], block_hash)) as s0, \
+            PeerStub(signing_routes(ws[1], block_hash)) as s1, \
+            PeerStub(signing_routes(ws[2], block_hash, delay=1)) as slow:
+        peers = [as_validator(s0, ws[0], 5), as_validator(slow, ws[2], 50), as_validator(s1, ws[1], 10)]
+        broadcaster = Broadcaster(peers)
+        try:
+            start = time.monotonic()
+            sigs = broadcaster.propose_block({"hash": block_hash}, [w["public_key"] for w in ws], quorum=2)
+            assert time.monotonic() - start < 0.8
+            assert set(sigs) == {ws[0]["public_key"], ws[1]["public_key"]}
+        finally:
+            broadcaster.close()
+
+
+def test_full_queue_applies_backpressure():
+    release = threading.Event()
+    with PeerStub({"POST /tx": lambda body: release.wait(5) and {"status": "ok"}}) as stub:
+        peer = PeerInfo("127.0.0.1", stub.port)
+        broadcaster = Broadcaster([peer], max_queue=1)
+        try:
+            sent = [broadcaster.broadcast("/tx", {"n": i}) for i in range(5)]
+            assert sum(1 for futures in sent if futures) < 5
+            assert broadcaster.stats()[peer.url]["dropped"] >= 3
+        finally:
+            release.set()
+            broadcaster.close()
@@ -0,0 +1,63 @@
+from blockchain_demo.chainindex import ChainIndex
+
+GENESIS = "0" * 64
+
+
+def h(name):
+    return name.encode().hex().ljust(64, "f")
+
+
+def build(index, parent, start_height, names, finalized=True, timestamp=0):
+    for offset, name in enumerate(names):
+        index.add(h(name), parent, start_height + offset, timestamp, finalized, work=1)
+        parent = h(name)
+    return parent
+
+
+def test_longest_finalized_chain_and_ancestors(tmp_path):
+    index = ChainIndex(path=str(tmp_path / "idx.log"))
+    index.add(GENESIS, GENESIS, 0, 0, True, work=1)
+    main_tip = build(index, GENESIS, 1, [f"m{i}" for i in range(1, 21)])
+    fork_tip = build(index, h("m7"), 8, [f"f{i}" for i in range(8, 30)], finalized=False)
+    assert index.tip == main_tip
+    assert index.canonical_at(5) == h("m5")
+    assert index.ancestor(fork_tip, 3) == h("m3")
+    assert index.common_ancestor(main_tip, fork_tip) == h("m7")
+    assert index.common_ancestor(h("m4"), main_tip) == h("m4")
+
+    # finalizing the fork from its base makes it the longest finalized chain
+    for i in range(8, 30):
+        index.mark_finalized(h(f"f{i}"))
+    assert index.tip == fork_tip
+    assert index.get(h("m7")).children == [h("m8"), h("f8")]
+
+    index.close()
+    reloaded = ChainIndex.load(str(tmp_path / "idx.log"))
+    assert reloaded.tip == fork_tip
+    assert reloaded.chain()[:9] == [GENESIS] + [h(f"m{i}") for i in range(1, 8)] + [h("f8")]
+
+
+def test_tie_breakers():
+    index = ChainIndex()
+    index.add(GENESIS, GENESIS, 0, 0, True, work=1)
+    index.add("b" * 64, GENESIS, 1, 5, True, work=1)
+    index.add("a" * 64, GENESIS, 1, 9, True, work=1)
+    assert index.tip == "a" * 64  # same height and work: lowest hash wins
+    index.add("c" * 64, GENESIS, 1, 1, True, work=2)
+    assert index.tip == "c" * 64  # more work wins
+
+
+def test_torn_tail_is_truncated_before_appending(tmp_path):
+    path = str(tmp_path / "idx.log")
+    index = ChainIndex(path=path)
+    index.add(GENESIS, GENESIS, 0, 0, True, work=1)
+    build(index, GENESIS, 1, ["a1", "a2"])
+    index.close()
+    with open(path, "r+b") as fh:
+        fh.truncate(fh.seek(0, 2) - 10)  # crash in the middle of the a2 record
+    reloaded = ChainIndex.load(path)
+    assert reloaded.tip == h("a1")
+    build(reloaded, h("a1"), 2, ["b2", "b3"])
+    reloaded.close()
+    again = ChainIndex.load(path)
+    assert again.tip == h("b3") and len(again) == 4
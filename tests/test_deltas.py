@@ -0,0 +1,38 @@
+import shelve
+import pytest
+from blockchain_demo.deltas import DeltaStore, compute_delta, apply_delta
+
+
+def test_compute_and_apply_delta():
+    parent = {"a": 1, "b": 2, "gone": 0}
+    child = {"a": 1, "b": 3, "c": 4}
+    delta = compute_delta(parent, child)
+    assert delta == {"set": {"b": 3, "c": 4}, "del": ["gone"]}
+    apply_delta(parent, delta)
+    assert parent == child
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_rebuild_from_nearest_checkpoint(tmp_path, persistent):
+    records = shelve.open(str(tmp_path / "deltas")) if persistent else None
+    store = DeltaStore(checkpoint_interval=4, records=records)
+    states = {}
+    state, balances = {"counter": 0}, {"miner": 0}
+    store.put("h0", None, 0, {"set": {}, "del": []}, {"set": {}, "del": []}, state=state, balances=balances)
+    states["h0"] = (dict(state), dict(balances))
+    for height in range(1, 11):
+        state_delta = {"set": {"counter": height, f"k{height}": height}, "del": []}
+        balances_delta = {"set": {"miner": 5 * height}, "del": []}
+        store.put(f"h{height}", f"h{height - 1}", height, state_delta, balances_delta)
+        apply_delta(state, state_delta)
+        apply_delta(balances, balances_delta)
+        states[f"h{height}"] = (dict(state), dict(balances))
+    assert [h for h in states if store.is_checkpoint(h)] == ["h0", "h4", "h8"]
+    for block_hash, expected in states.items():
+        assert store.get(block_hash) == expected
+    assert store.diff("h6") == {
+        "state": {"set": {"counter": 6, "k6": 6}, "del": []},
+        "balances": {"set": {"miner": 30}, "del": []},
+    }
+    if records is not None:
+        records.close()
@@ -28,3 +28,23 @@ def test_unknown_variable():
     script = "let b = c + 1"
     with pytest.raises(dsl.DSLExecutionError):
         dsl.execute(script, {})
+
+
+def test_compile_script_resolves_terms_and_is_cached():
+    script = "let a = b + 2; let c = a - b - 1"
+    compiled = dsl.compile_script(script)
+    assert compiled.statements == (
+        ("a", ((1, "b"), (1, 2))),
+        ("c", ((1, "a"), (-1, "b"), (-1, 1))),
+    )
+    assert compiled.reads == {"a", "b"}
+    assert compiled.writes == {"a", "c"}
+    assert dsl.compile_script(script) is compiled
+    state = {"b": 5}
+    dsl.apply(compiled, state)
+    assert state == {"a": 7, "b": 5, "c": 1}
+
+
+def test_compile_script_rejects_invalid_syntax():
+    with pytest.raises(dsl.DSLExecutionError):
+        dsl.compile_script("let a = 1 +")
@@ -0,0 +1,85 @@
+import random
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from blockchain_demo import dsl, executor as executor_mod
+from blockchain_demo.block import Block
+from blockchain_demo.config import Config
+from blockchain_demo.executor import conflict_levels, execute_block
+from blockchain_demo.overlay import StateOverlay
+from blockchain_demo.sync import replay_block
+from blockchain_demo.transaction import Transaction
+from blockchain_demo.validation import ValidationEngine, ValidationError
+
+
+def txs_for(scripts):
+    return [Transaction(from_addr="a", script=s, premium=1, nonce=i + 1) for i, s in enumerate(scripts)]
+
+
+def test_conflict_levels():
+    scripts = ['let a=1', 'let b=2', 'let c=a+1', 'let a=5', 'let d=b', 'let b=c']
+    levels = conflict_levels([dsl.compile_script(s) for s in scripts])
+    # c reads a (RAW), a=5 rewrites a (WAW) after c read it (WAR, same level allowed)
+    assert levels == [[0, 1], [2, 3, 4], [5]]
+
+
+def random_scripts(rng, count, keys):
+    scripts = []
+    for _ in range(count):
+        stmts = []
+        for _ in range(rng.randint(1, 3)):
+            terms = [rng.choice(keys + [str(rng.randint(0, 9))]) for _ in range(rng.randint(1, 3))]
+            expr = terms[0] + "".join(rng.choice("+-") + t for t in terms[1:])
+            stmts.append(f"let {rng.choice(keys)}={expr}")
+        scripts.append("; ".join(stmts) if rng.random() > 0.05 else "let = broken")
+    return scripts
+
+
+def test_matches_sequential_create_candidate():
+    rng = random.Random(7)
+    keys = [f"k{i}" for i in range(12)]
+    for _ in range(30):
+        parent = {k: rng.randint(0, 5) for k in keys[:6]}  # the rest starts unknown
+        txs = txs_for(random_scripts(rng, 40, keys))
+        sequential = Block.create_candidate("00" * 32, 1, "m", txs, parent, {})
+        included, state = execute_block(txs, parent)
+        assert included == list(sequential.transactions)
+        assert state.to_dict() == sequential.state
+
+
+def test_process_pool_levels(monkeypatch):
+    monkeypatch.setattr(executor_mod, "PARALLEL_MIN_LEVEL", 2)
+    rng = random.Random(3)
+    keys = [f"k{i}" for i in range(40)]
+    parent = {k: 1 for k in keys}
+    txs = txs_for(random_scripts(rng, 60, keys))
+    sequential = Block.create_candidate("00" * 32, 1, "m", txs, parent, {})
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = Block.create_candidate("00" * 32, 1, "m", txs, parent, {}, executor=pool)
+    assert parallel.transactions == sequential.transactions
+    assert parallel.state == sequential.state
+
+
+def test_parallel_replay_matches_sequential(monkeypatch):
+    monkeypatch.setattr(executor_mod, "PARALLEL_MIN_LEVEL", 2)
+    cfg = Config()
+    rng = random.Random(11)
+    keys = [f"k{i}" for i in range(40)]
+    parent = {k: 1 for k in keys}
+    candidate = Block.create_candidate("00" * 32, 1, "m", txs_for(random_scripts(rng, 80, keys)), parent, {})
+    block = Block(candidate.header, candidate.transactions, candidate.state, {"m": cfg.BLOCK_REWARD})
+    overlay = StateOverlay(parent)
+    for tx in block.transactions:
+        dsl.apply(dsl.compile_script(tx.script), overlay)
+    assert overlay.to_dict() == block.state
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert execute_block(block.transactions, parent, pool, strict=True)[1].to_dict() == overlay.to_dict()
+        assert replay_block(block, parent, {}, cfg, pool) is None
+        engine = ValidationEngine(cfg, executor=pool)
+        engine.add("00" * 32, parent, {})
+        assert dict(engine.validate(block)[0]) == block.state
+        # a replayed block is rejected when one of its txs fails, not trimmed
+        broken = Block(block.header, list(block.transactions) + txs_for(["let k0=missing"]),
+                       block.state, block.balances)
+        assert "script replay failed" in replay_block(broken, parent, {}, cfg, pool)
+        with pytest.raises(ValidationError, match="script replay failed"):
+            engine.validate(broken)
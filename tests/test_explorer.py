@@ -0,0 +1,143 @@
+import os
+import json
+import threading
+import requests
+from blockchain_demo import explorer as explorer_mod
+from blockchain_demo.block import Block, BlockHeader
+from blockchain_demo.blockstore import _encode
+from blockchain_demo.chainindex import ChainIndex
+from blockchain_demo.config import Config
+from blockchain_demo.deltas import DeltaStore
+from blockchain_demo.explorer import Explorer, serve
+from blockchain_demo.transaction import Transaction
+from blockchain_demo.txindex import ExplorerIndex
+from blockchain_demo import wallet
+
+CFG = Config(QUORUM_PERCENT=51)
+
+
+def build(tmp_path, length):
+    user = wallet.generate_wallet(os.path.join(tmp_path, 'u.json'), local_role='user')
+    validator = wallet.generate_wallet(os.path.join(tmp_path, 'v.json'), local_role='validator')
+    validator_set = [validator['public_key']]
+    state, balances = {"x": 0}, {user['public_key']: 100}
+    genesis = Block(BlockHeader("00" * 32, 0, 0, 0, "genesis"), [], state, balances, finalized=True)
+    blocks = [genesis]
+    for height in range(1, length + 1):
+        tx = Transaction(from_addr=user['public_key'], script=f'let x={height}', premium=1, nonce=height)
+        tx.sign(user)
+        parent = blocks[-1]
+        block = Block.create_candidate(parent.hash(), height, "miner", [tx], parent.state, parent.balances)
+        block.add_validator_signature(validator['public_key'], wallet.sign(validator, block.hash()), validator_set)
+        blocks.append(block.finalize(validator_set, parent.balances, CFG))
+    chain = ChainIndex()
+    raw = {}
+    index = ExplorerIndex(os.path.join(tmp_path, 'explorer.sqlite'))
+    for block in blocks:
+        data = block.to_json()
+        raw[block.hash()] = _encode(data)
+        chain.add_block(data)
+        index.connect_block(block)
+    by_hash = {b.hash(): b for b in blocks}
+    fetches = []
+
+    def raw_block(block_hash):
+        fetches.append(block_hash)
+        return raw[block_hash]
+
+    ex = Explorer(chain, raw_block, lambda h: (by_hash[h].state, by_hash[h].balances), index, page_size=2)
+    return ex, user['public_key'], blocks, fetches
+
+
+def body(response):
+    return json.loads(b"".join(response.body))
+
+
+def test_etag_304_and_tip_keyed_cache(tmp_path):
+    ex, _, blocks, fetches = build(tmp_path, 3)
+    first = ex.handle("/chain?cursor=1")
+    assert first.status == 200
+    assert [b["hash"] for b in body(first)["blocks"]] == [b.hash() for b in blocks[1:3]]
+    assert len(fetches) == 2
+    # cached body, and a conditional request never touches the block store
+    assert body(ex.handle("/chain?cursor=1"))["next"] == 3
+    assert ex.handle("/chain?cursor=1", {"If-None-Match": first.headers["ETag"]}).status == 304
+    assert len(fetches) == 2 and ex.cache.hits == 1
+    # a new tip changes the ETag
+    ex.chain.add("ff" * 32, blocks[-1].hash(), 4, 0, True, work=1)
+    assert ex.handle("/chain?cursor=1", {"If-None-Match": first.headers["ETag"]}).status == 200
+
+
+def test_missing_resources_are_404_even_with_matching_etag(tmp_path):
+    ex, _, blocks, fetches = build(tmp_path, 2)
+    for path in ("/block/" + "ab" * 32, "/tx/unknown", "/diff/" + blocks[1].hash()):
+        response = ex.handle(path, {"If-None-Match": ex.etag(ex.chain.tip, path)})
+        assert response.status == 404
+    path = "/block/" + blocks[1].hash()
+    assert ex.handle(path, {"If-None-Match": ex.etag(ex.chain.tip, path)}).status == 304
+    assert fetches == []
+
+
+def test_diff_route(tmp_path):
+    ex, _, blocks, _ = build(tmp_path, 2)
+    deltas = DeltaStore()
+    deltas.put(blocks[0].hash(), None, 0, {"set": {}, "del": []}, {"set": {}, "del": []},
+               blocks[0].state, blocks[0].balances)
+    for block in blocks[1:]:
+        deltas.put_block(block.to_json(), *deltas.get(block.header.prev_hash))
+    loads = []
+    ex.diff_loader = lambda h: loads.append(h) or deltas.diff(h)
+    path = "/diff/" + blocks[2].hash()
+    first = ex.handle(path)
+    diff = body(first)
+    assert diff["state"] == {"set": {"x": 2}, "del": []}
+    assert diff == deltas.diff(blocks[2].hash())
+    # conditional requests and cache hits never call the loader
+    assert ex.handle(path, {"If-None-Match": first.headers["ETag"]}).status == 304
+    assert body(ex.handle(path)) == diff
+    assert loads == [blocks[2].hash()]
+    assert ex.handle("/diff/" + "ab" * 32).status == 404
+
+
+def test_chain_and_address_pagination(tmp_path):
+    ex, user, blocks, _ = build(tmp_path, 5)
+    page, cursor, seen = None, "0", []
+    while cursor is not None:
+        page = body(ex.handle(f"/chain?cursor={cursor}"))
+        seen += [b["hash"] for b in page["blocks"]]
+        cursor = page["next"]
+    assert seen == [b.hash() for b in blocks]
+    first = body(ex.handle(f"/address/{user}?limit=3"))
+    assert len(first["txs"]) == 3 and first["balance"] == 100
+    rest = body(ex.handle(f"/address/{user}?limit=3&cursor={first['next']}"))
+    assert [t["height"] for t in rest["txs"]] == [4, 5] and rest["next"] is None
+    tx = blocks[2].transactions[0]
+    assert body(ex.handle(f"/tx/{tx.hash()}"))["tx"] == tx.to_json()
+    assert ex.handle("/tx/unknown").status == 404
+    assert ex.handle("/chain?limit=0").status == 400
+
+
+def test_http_streams_chunked_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(explorer_mod, "CHUNK_BYTES", 64)
+    ex, _, blocks, _ = build(tmp_path, 2)
+    server = serve(ex, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        r = requests.get(url + "/state")
+        assert r.headers["Transfer-Encoding"] == "chunked"
+        assert r.json() == blocks[-1].state
+        assert requests.get(url + "/balances").json() == blocks[-1].balances
+        # ETags are per path: the /state one does not match /balances
+        assert requests.get(url + "/balances", headers={"If-None-Match": r.headers["ETag"]}).status_code == 200
+        etag = requests.get(url + "/balances").headers["ETag"]
+        assert requests.get(url + "/balances", headers={"If-None-Match": etag}).status_code == 304
+        assert requests.get(url + "/branches").json()["branches"][0]["hash"] == blocks[-1].hash()
+        # index lookups run on the server's request threads
+        tx = blocks[1].transactions[0]
+        assert requests.get(url + f"/tx/{tx.hash()}").json()["tx"] == tx.to_json()
+        page = requests.get(url + f"/address/{tx.from_addr}?limit=1").json()
+        assert [t["tx_hash"] for t in page["txs"]] == [tx.hash()] and page["next"] == "1:0"
+    finally:
+        server.shutdown()
+        server.server_close()
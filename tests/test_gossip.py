@@ -0,0 +1,125 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from blockchain_demo.gossip import RotatingBloomFilter, TxGossip
+from blockchain_demo.mempool import Mempool
+from blockchain_demo.transaction import Transaction
+from blockchain_demo import wallet
+
+
+def make_txs(tmp_path, count):
+    w = wallet.generate_wallet(os.path.join(tmp_path, 'w.json'), local_role='user')
+    txs = []
+    for nonce in range(1, count + 1):
+        tx = Transaction(from_addr=w['public_key'], script=f'let x={nonce}', premium=1, nonce=nonce)
+        tx.sign(w)
+        txs.append(tx)
+    return w, txs
+
+
+class CountingMempool(Mempool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def add_txs(self, batch, executor=None, max_workers=None):
+        self.batches.append(len(batch))
+        return super().add_txs(batch, executor, max_workers)
+
+
+def test_rotating_bloom_forgets_old_generation():
+    seen = RotatingBloomFilter(capacity=10)
+    for i in range(10):
+        seen.add(f"k{i}")
+    for i in range(10, 20):
+        seen.add(f"k{i}")
+    assert all(f"k{i}" in seen for i in range(20))
+    seen.add("k20")  # rotates: k0..k9 are dropped
+    assert sum(f"k{i}" in seen for i in range(10)) <= 1
+    assert all(f"k{i}" in seen for i in range(10, 21))
+
+
+def test_batches_flush_on_count_and_delay(tmp_path):
+    _, txs = make_txs(tmp_path, 5)
+    sent = []
+    gossip = TxGossip(Mempool(), lambda path, payload: sent.append((path, payload)), max_batch_txs=3, max_delay=0.05)
+    for tx in txs:
+        assert gossip.queue_tx(tx) is True
+    assert gossip.queue_tx(txs[0]) is False
+    assert sent == [("/tx_announce", {"hashes": [tx.hash() for tx in txs[:3]]})]
+    gossip.poll()
+    assert len(sent) == 1
+    time.sleep(0.06)
+    gossip.poll()
+    assert sent[1][1]["hashes"] == [tx.hash() for tx in txs[3:]]
+
+
+def test_batches_flush_on_bytes(tmp_path):
+    _, txs = make_txs(tmp_path, 3)
+    sent = []
+    size = len(txs[0].wire_bytes())
+    gossip = TxGossip(Mempool(), lambda path, payload: sent.append(payload), max_batch_bytes=2 * size)
+    for tx in txs:
+        gossip.queue_tx(tx)
+    assert [len(p["hashes"]) for p in sent] == [2]
+
+
+def test_announce_fetch_admit_roundtrip(tmp_path):
+    w, txs = make_txs(tmp_path, 4)
+    sender = TxGossip(Mempool(), lambda path, payload: None)
+    for tx in txs:
+        sender.queue_tx(tx)
+    relayed = []
+    mempool = CountingMempool(balances={w['public_key']: 100})
+    receiver = TxGossip(mempool, lambda path, payload: relayed.extend(payload["hashes"]), max_batch_txs=4)
+    receiver.on_txs([txs[0].to_json()])
+    hashes = [tx.hash() for tx in txs]
+    missing = receiver.on_announce(hashes)
+    assert missing == hashes[1:]
+    # a second announce of the same hashes does not trigger another fetch
+    assert receiver.on_announce(hashes) == []
+    results = receiver.on_txs(sender.serve_fetch(missing))
+    assert results == [True, True, True]
+    assert mempool.batches == [1, 3]
+    assert len(mempool) == 4
+    assert relayed == hashes
+    # duplicates are dropped before reaching the mempool
+    assert receiver.on_txs([txs[1].to_json(), txs[2].wire_bytes()]) == [False, False]
+    assert receiver.duplicates == 2
+    assert mempool.batches == [1, 3]
+
+
+def test_forged_copy_does_not_shadow_genuine_tx(tmp_path):
+    w, txs = make_txs(tmp_path, 1)
+    genuine = txs[0]
+    forged = Transaction.from_json(dict(genuine.to_json(), signature=genuine.signature[::-1]))
+    assert forged.hash() == genuine.hash()
+    mempool = CountingMempool(balances={w['public_key']: 100})
+    with ThreadPoolExecutor(2) as pool:
+        receiver = TxGossip(mempool, lambda path, payload: None, executor=pool)
+        assert receiver.on_txs([forged.to_json()]) == [False]
+        assert receiver.on_announce([genuine.hash()]) == [genuine.hash()]
+        assert receiver.on_txs([genuine.to_json()]) == [True]
+    assert mempool.txs[genuine.hash()][1].signature == genuine.signature
+    assert receiver.on_txs([genuine.to_json()]) == [False]
+    assert mempool.batches == [1, 1]
+
+
+def test_slow_send_does_not_hold_the_lock(tmp_path):
+    _, txs = make_txs(tmp_path, 2)
+    sending, release = threading.Event(), threading.Event()
+
+    def slow_send(path, payload):
+        sending.set()
+        release.wait(5)
+
+    gossip = TxGossip(Mempool(), slow_send, max_batch_txs=1)
+    worker = threading.Thread(target=gossip.queue_tx, args=(txs[0],))
+    worker.start()
+    assert sending.wait(5)
+    # the announce is in flight; other callers are not blocked behind it
+    assert gossip.on_announce([txs[1].hash()]) == [txs[1].hash()]
+    assert gossip.serve_fetch([txs[0].hash()]) == [txs[0].to_json()]
+    release.set()
+    worker.join()
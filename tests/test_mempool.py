@@ -58,3 +58,175 @@ def test_queue_modes(tmp_path):
     ordered2 = mp2.pop_for_block(2)
     assert [t.premium for t in ordered2] == [1, 5]
 
+
+def test_premium_ties_keep_arrival_order_and_remove_by_hash(tmp_path):
+    wallets = [create_wallet(tmp_path) for _ in range(4)]
+    balances = {w['public_key']: 100 for w in wallets}
+    mp = Mempool(balances=balances, mode='premium')
+    txs = []
+    for w, premium in zip(wallets, [2, 3, 2, 1]):
+        tx = Transaction(from_addr=w['public_key'], script='let a=1', premium=premium, nonce=1)
+        tx.sign(w)
+        assert mp.add_tx(tx)
+        txs.append(tx)
+    assert len(mp) == 4
+    assert mp.remove_tx(txs[3].hash()) is txs[3]
+    assert mp.remove_tx(txs[3].hash()) is None
+    assert txs[3].hash() not in mp
+    ordered = mp.pop_for_block(10)
+    assert ordered == [txs[1], txs[0], txs[2]]
+    assert len(mp) == 0
+    assert mp.pop_for_block(3) == []
+
+
+def test_add_txs_matches_sequential_admission(tmp_path):
+    w1 = create_wallet(tmp_path)
+    w2 = create_wallet(tmp_path)
+    balances = {w1['public_key']: 5, w2['public_key']: 5}
+    good = Transaction(from_addr=w1['public_key'], script='let a=1', premium=1, nonce=1)
+    good.sign(w1)
+    forged = Transaction(from_addr=w1['public_key'], script='let a=2', premium=1, nonce=2)
+    forged.sign(w2)
+    rich = Transaction(from_addr=w2['public_key'], script='let a=1', premium=50, nonce=1)
+    rich.sign(w2)
+    bad_dsl = Transaction(from_addr=w2['public_key'], script='let a 1', premium=1, nonce=1)
+    bad_dsl.sign(w2)
+    next_nonce = Transaction(from_addr=w1['public_key'], script='let b=1', premium=1, nonce=3)
+    next_nonce.sign(w1)
+    batch = [good, good, forged, rich, bad_dsl, next_nonce]
+
+    mp = Mempool(balances=balances, mode='fifo')
+    assert mp.add_txs(batch) == [True, False, False, False, False, True]
+    sequential = Mempool(balances=balances, mode='fifo')
+    assert [sequential.add_tx(tx) for tx in batch] == [True, False, False, False, False, True]
+    assert mp.pop_for_block(5) == sequential.pop_for_block(5) == [good, next_nonce]
+
+
+def test_add_txs_with_process_pool(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    w = create_wallet(tmp_path)
+    mp = Mempool(balances={w['public_key']: 100}, mode='premium')
+    batch = []
+    for nonce in range(1, 5):
+        tx = Transaction(from_addr=w['public_key'], script='let a=1', premium=nonce, nonce=nonce)
+        tx.sign(w)
+        batch.append(tx)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert mp.add_txs(batch, executor=pool) == [True] * 4
+    assert [t.premium for t in mp.pop_for_block(4)] == [4, 3, 2, 1]
+
+
+def signed(w, premium, nonce, script='let a=1'):
+    tx = Transaction(from_addr=w['public_key'], script=script, premium=premium, nonce=nonce)
+    tx.sign(w)
+    return tx
+
+
+def test_count_and_byte_caps_evict_lowest_premium(tmp_path):
+    wallets = [create_wallet(tmp_path) for _ in range(4)]
+    mp = Mempool(balances={w['public_key']: 100 for w in wallets}, mode='premium', max_txs=3)
+    low, mid, high = signed(wallets[0], 1, 1), signed(wallets[1], 5, 1), signed(wallets[2], 7, 1)
+    assert all(mp.add_tx(tx) for tx in (low, mid, high))
+    # a full pool rejects what it would evict immediately, before the signature check
+    assert mp.add_tx(signed(wallets[3], 1, 1)) is False
+    better = signed(wallets[3], 3, 1)
+    assert mp.add_tx(better) is True
+    assert low.hash() not in mp and mp.stats()["evicted"] == 1
+    assert mp.pop_for_block(10) == [high, mid, better]
+
+    size = len(low.wire_bytes())
+    mp = Mempool(balances={w['public_key']: 100 for w in wallets}, mode='fifo', max_bytes=2 * size + 10)
+    assert mp.add_tx(low) and mp.add_tx(mid)
+    assert mp.add_tx(high) is True
+    assert mp.stats()["count"] == 2 and mp.bytes <= 2 * size + 10
+    assert mp.pop_for_block(10) == [mid, high]
+
+
+def test_byte_cap_rejection_leaves_pool_and_nonce_untouched(tmp_path):
+    wallets = [create_wallet(tmp_path) for _ in range(3)]
+    w = wallets[0]
+    mid, high = signed(wallets[1], 5, 1), signed(wallets[2], 7, 1)
+    size = len(mid.wire_bytes())
+    mp = Mempool(balances={x['public_key']: 100 for x in wallets}, mode='premium', max_bytes=2 * size + 10)
+    assert mp.add_tx(mid) and mp.add_tx(high)
+    # the newcomer would be the first victim: rejected, and the nonce stays free
+    assert mp.add_tx(signed(w, 1, 1)) is False
+    assert mp.nonces.get(w['public_key'], 0) == 0 and mp.stats()["evicted"] == 0
+    retry = signed(w, 6, 1)
+    assert mp.add_tx(retry) is True
+    assert mid.hash() not in mp and mp.stats()["evicted"] == 1
+
+    # a replacement that would be evicted keeps the original
+    bump = signed(w, 7, 1, script='let a=' + '1' * 200)
+    assert mp.add_tx(bump) is False
+    assert retry.hash() in mp and len(mp) == 2 and mp.stats()["replaced"] == 0
+    assert mp.pop_for_block(5) == [high, retry]
+
+
+def test_per_sender_cap_and_replace_by_premium(tmp_path):
+    w = create_wallet(tmp_path)
+    mp = Mempool(balances={w['public_key']: 100}, mode='premium', max_per_sender=2)
+    first, second = signed(w, 2, 1), signed(w, 2, 2)
+    assert mp.add_tx(first) and mp.add_tx(second)
+    assert mp.add_tx(signed(w, 9, 3)) is False
+    # same (from_addr, nonce) needs a strictly higher premium
+    assert mp.add_tx(signed(w, 2, 1, script='let a=2')) is False
+    bump = signed(w, 4, 1, script='let a=2')
+    assert mp.add_tx(bump) is True
+    assert first.hash() not in mp and len(mp) == 2
+    assert mp.stats()["replaced"] == 1
+    assert mp.pop_for_block(5) == [bump, second]
+    assert mp.by_sender == {} and mp.bytes == 0
+
+
+def test_ttl_sweep_drops_old_entries(tmp_path):
+    import time
+
+    w = create_wallet(tmp_path)
+    mp = Mempool(balances={w['public_key']: 100}, mode='fifo', ttl=60)
+    txs = [signed(w, 1, n) for n in (1, 2)]
+    assert mp.add_txs(txs) == [True, True]
+    mp.remove_tx(txs[0].hash())
+    assert mp.sweep(now=time.monotonic() + 61) == 1
+    assert len(mp) == 0 and mp.stats()["expired"] == 1
+
+
+def test_pending_premiums_are_reserved(tmp_path):
+    w = create_wallet(tmp_path)
+    mp = Mempool(balances={w['public_key']: 5}, mode='premium')
+    assert mp.add_tx(signed(w, 3, 1)) is True
+    assert mp.add_tx(signed(w, 3, 2)) is False
+    assert mp.add_tx(signed(w, 2, 2)) is True
+    assert mp.pending_premium == {w['public_key']: 5}
+    # a replacement only needs the difference
+    assert mp.add_tx(signed(w, 3, 2, script='let a=2')) is False
+    mp.pop_for_block(1)
+    assert mp.pending_premium == {w['public_key']: 2}
+
+
+def test_block_connect_and_disconnect_reconcile_pool(tmp_path):
+    from blockchain_demo.block import Block, BlockHeader
+
+    w1, w2 = create_wallet(tmp_path), create_wallet(tmp_path)
+    a, b = w1['public_key'], w2['public_key']
+    mp = Mempool(balances={a: 10, b: 10}, mode='premium')
+    ours = [signed(w1, 1, 1), signed(w1, 1, 2), signed(w1, 1, 3)]
+    other = signed(w2, 4, 1)
+    assert mp.add_txs(ours + [other]) == [True] * 4
+    # a competing block mined w1's nonce 2 with a different tx, plus `other`
+    competing = signed(w1, 2, 2, script='let z=1')
+    block = Block(BlockHeader("00" * 32, 1, 0, 0, "miner"), [ours[0], competing, other], {},
+                  {a: 10, b: 10, "miner": 5, "val": 7}, finalized=True, signers_frozen=["val"])
+    assert mp.on_block_connected(block) == 3
+    assert list(mp.tx_hashes) == [ours[2].hash()]
+    assert mp.balances == {a: 10, b: 10, "miner": 5, "val": 7}
+    assert mp.nonces[a] == 3 and mp.nonces[b] == 1
+    assert mp.add_tx(signed(w1, 1, 2)) is False
+
+    # the block is unwound: its txs come back, the orphaned one stays pending
+    assert mp.on_block_disconnected(block, {a: 10, b: 10}) == 3
+    assert mp.balances == {a: 10, b: 10}
+    assert set(mp.tx_hashes) == {ours[0].hash(), competing.hash(), ours[2].hash(), other.hash()}
+    assert mp.nonces[a] == 3
+    assert [t.hash() for t in mp.pop_for_block(2)] == [other.hash(), competing.hash()]
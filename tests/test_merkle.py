@@ -0,0 +1,28 @@
+import pytest
+from blockchain_demo import merkle
+
+
+def test_proofs_verify_for_every_leaf():
+    for size in range(1, 8):
+        leaves = [b"leaf%d" % i for i in range(size)]
+        root = merkle.merkle_root(leaves)
+        for i, leaf in enumerate(leaves):
+            proof = merkle.merkle_proof(leaves, i)
+            assert merkle.verify_proof(leaf, proof, root)
+            assert not merkle.verify_proof(b"other", proof, root)
+
+
+def test_empty_and_out_of_range():
+    assert merkle.merkle_root([]) == merkle.EMPTY_ROOT
+    with pytest.raises(IndexError):
+        merkle.merkle_proof([b"a"], 1)
+
+
+def test_mapping_entry_proof():
+    balances = {"bob": 3, "alice": 10, "carol": 0}
+    root = merkle.mapping_root(balances)
+    proof = merkle.mapping_proof(balances, "bob")
+    assert merkle.verify_entry("bob", 3, proof, root)
+    assert not merkle.verify_entry("bob", 4, proof, root)
+    with pytest.raises(KeyError):
+        merkle.mapping_proof(balances, "dave")
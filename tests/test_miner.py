@@ -0,0 +1,50 @@
+import threading
+from blockchain_demo import block as block_module
+from blockchain_demo.block import Block
+from blockchain_demo.config import Config
+from blockchain_demo import config, miner
+
+
+def candidate():
+    return Block.create_candidate("0" * 64, 1, "miner", [], {"a": 1}, {"x": 1})
+
+
+def test_parallel_mining_finds_valid_nonce():
+    block = candidate()
+    reports = []
+    result = miner.mine(block.pow_template(), 10, workers=2, progress=reports.append, report_interval=0.01)
+    assert result.nonce is not None
+    block.header = block.header.with_nonce(result.nonce)
+    assert int(block.hash(), 16) < 2 ** (256 - 10)
+    assert result.hashes > 0
+    assert all(r.hashrate >= 0 for r in reports)
+
+
+def test_cancel_event_stops_workers():
+    cancel = threading.Event()
+    cancel.set()
+    result = miner.mine(candidate().pow_template(), 255, workers=2, cancel=cancel, report_interval=0.01)
+    assert result.nonce is None
+
+
+def test_proof_of_work_wrapper_reports_cancellation():
+    block = candidate()
+    cancel = threading.Event()
+    cancel.set()
+    assert block.proof_of_work(255, cancel=cancel) is False
+    assert block.header.nonce == 0
+    assert block.proof_of_work(4) is True
+
+
+def test_proof_of_work_defaults_to_configured_workers(monkeypatch):
+    calls = []
+
+    def fake_mine(template, bits, workers, cancel, progress):
+        calls.append(workers)
+        return miner.mine(template, bits, workers=1)
+
+    monkeypatch.setattr(block_module, "mine", fake_mine)
+    monkeypatch.setattr(config, "CFG", Config(MINER_WORKERS=3))
+    assert candidate().proof_of_work(4) is True
+    assert candidate().proof_of_work(4, workers=1) is True
+    assert calls == [3, 1]
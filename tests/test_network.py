@@ -0,0 +1,33 @@
+import os
+import socket
+from blockchain_demo import wallet
+from blockchain_demo.network import PeerDiscovery, PeerInfo
+from tests.peer_stub import PeerStub, node_routes
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_discovery_probes_concurrently_with_backoff(tmp_path):
+    val = wallet.generate_wallet(os.path.join(tmp_path, 'v.json'), local_role='validator')
+    other = wallet.generate_wallet(os.path.join(tmp_path, 'o.json'), local_role='miner')
+    with PeerStub(node_routes(val)) as v_stub, PeerStub(node_routes(other)) as o_stub:
+        peers = [PeerInfo("127.0.0.1", v_stub.port), PeerInfo("127.0.0.1", o_stub.port), PeerInfo("127.0.0.1", free_port())]
+        updates = []
+        discovery = PeerDiscovery(peers, [val['public_key']], timeout=1, retry_base=60,
+                                  on_update=lambda p, ok: updates.append((p.port, ok)))
+        try:
+            results = discovery.probe_all()
+            assert sorted(results.values()) == [False, True, True]
+            assert discovery.validators() == [peers[0]]
+            assert peers[1].pubkey == other['public_key'] and not peers[1].is_validator
+            assert peers[0].latency_ms > 0
+            assert discovery.failures == {peers[2].url: 1}
+            assert len(updates) == 3
+            # the dead peer is backed off, live peers are probed again
+            assert set(discovery.probe_all()) == {peers[0].url, peers[1].url}
+        finally:
+            discovery.close()
@@ -0,0 +1,30 @@
+import pytest
+from blockchain_demo.overlay import StateOverlay
+
+
+def test_overlay_reads_through_and_materialises():
+    base = {"a": 1, "b": 2}
+    state = StateOverlay(base)
+    state["b"] = 5
+    state["c"] = 7
+    assert state["a"] == 1 and state["b"] == 5 and "c" in state
+    assert len(state) == 3
+    assert sorted(state) == ["a", "b", "c"]
+    assert state.to_dict() == {"a": 1, "b": 5, "c": 7}
+    assert base == {"a": 1, "b": 2}
+
+
+def test_overlay_rollback_restores_previous_writes():
+    state = StateOverlay({"a": 1})
+    state.begin()
+    state["a"] = 2
+    state.commit()
+    state.begin()
+    state["a"] = 3
+    state["new"] = 1
+    state["a"] = 4
+    state.rollback()
+    assert state.writes == {"a": 2}
+    assert "new" not in state
+    with pytest.raises(KeyError):
+        state["new"]
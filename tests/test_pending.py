@@ -0,0 +1,59 @@
+import os
+from blockchain_demo.block import Block, BlockHeader
+from blockchain_demo.pending import PendingPool
+from blockchain_demo import wallet
+
+
+def candidate(height=1):
+    return Block(BlockHeader("00" * 32, height, 0, 0, "miner"), [], {"x": 0}, {})
+
+
+def validators(tmp_path, count):
+    return [wallet.generate_wallet(os.path.join(tmp_path, f'v{i}.json'), local_role='validator') for i in range(count)]
+
+
+def test_quorum_triggers_callback_once_and_keeps_late_signatures(tmp_path):
+    vs = validators(tmp_path, 3)
+    finalized = []
+    pool = PendingPool([v['public_key'] for v in vs], on_finalize=lambda b, s: finalized.append((b, s)),
+                       quorum_percent=51)
+    block = candidate()
+    block_hash = pool.add_candidate(block)
+    assert pool.add_signature(block_hash, vs[0]['public_key'], wallet.sign(vs[0], block_hash))
+    # invalid and non-validator signatures are rejected
+    assert not pool.add_signature(block_hash, vs[1]['public_key'], wallet.sign(vs[0], block_hash))
+    outsider = wallet.generate_wallet(os.path.join(tmp_path, 'o.json'))
+    assert not pool.add_signature(block_hash, outsider['public_key'], wallet.sign(outsider, block_hash))
+    assert finalized == []
+    assert pool.add_signature(block_hash, vs[1]['public_key'], wallet.sign(vs[1], block_hash))
+    assert finalized == [(block, sorted([vs[0]['public_key'], vs[1]['public_key']]))]
+    # a late signature is merged but does not finalize again
+    assert pool.add_signature(block_hash, vs[2]['public_key'], wallet.sign(vs[2], block_hash))
+    assert len(finalized) == 1
+    assert pool.signer_count(block_hash) == 3
+    assert set(block.validator_signatures) == {v['public_key'] for v in vs}
+    assert pool.rejected == 1
+
+
+def test_candidate_copies_merge_signatures(tmp_path):
+    vs = validators(tmp_path, 2)
+    pool = PendingPool([v['public_key'] for v in vs], quorum_percent=100)
+    first, copy = candidate(), candidate()
+    block_hash = first.hash()
+    first.validator_signatures = {vs[0]['public_key']: wallet.sign(vs[0], block_hash)}
+    copy.validator_signatures = {vs[1]['public_key']: wallet.sign(vs[1], block_hash), vs[0]['public_key']: "00"}
+    pool.add_candidate(first)
+    pool.add_candidate(copy)
+    assert pool.get(block_hash) is first
+    assert pool.signer_count(block_hash) == 2
+
+
+def test_expiry_heap_drops_due_candidates(tmp_path):
+    pool = PendingPool([], ttl=10)
+    a = pool.add_candidate(candidate(1), now=0)
+    b = pool.add_candidate(candidate(2), now=5)
+    assert pool.next_deadline() == 10
+    assert pool.expire(now=9) == []
+    assert pool.expire(now=10) == [a]
+    assert a not in pool and b in pool
+    assert pool.expire(now=20) == [b] and len(pool) == 0
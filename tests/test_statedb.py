@@ -0,0 +1,62 @@
+import json
+import pytest
+from types import SimpleNamespace
+from blockchain_demo import dsl
+from blockchain_demo.block import Block
+from blockchain_demo.deltas import delta_from_writes
+from blockchain_demo.overlay import StateOverlay
+from blockchain_demo.config import Config
+from blockchain_demo.statedb import SQLiteStateStore, migrate_json_snapshots, open_state
+
+
+def test_apply_and_rollback_block(tmp_path):
+    with SQLiteStateStore(str(tmp_path / "s.sqlite")) as store:
+        store.load_snapshot({"counter": 1}, {"alice": 10})
+        overlay = StateOverlay(store.state)
+        dsl.apply(dsl.compile_script("let counter = counter + 1; let temp = counter - 2"), overlay)
+        store.apply_block("b1", 1, delta_from_writes(overlay.writes), {"set": {"alice": 7, "miner": 5}, "del": []})
+        assert dict(store.state) == {"counter": 2, "temp": 0}
+        assert store.balances["miner"] == 5
+        assert store.tip() == ("b1", 1)
+        with pytest.raises(ValueError):
+            store.rollback_block("other")
+        store.rollback_block("b1")
+        assert dict(store.state) == {"counter": 1}
+        assert dict(store.balances) == {"alice": 10}
+        assert "miner" not in store.balances
+        assert store.tip() is None
+
+
+def test_finalize_against_sqlite_balances(tmp_path):
+    cfg = SimpleNamespace(QUORUM_PERCENT=51, BLOCK_REWARD=5, PREMIUM_REMAINDER_TARGET="miner")
+    with SQLiteStateStore(str(tmp_path / "s.sqlite")) as store:
+        store.load_snapshot({}, {"miner": 1, "v1": 0, "other": 3})
+        block = Block.create_candidate("0" * 64, 1, "miner", [], store.state, store.balances)
+        block.validator_signatures = {"v1": "sig", "v2": "sig"}
+        updates = block.balance_updates(block.quorum_signers(["v1", "v2", "v3"], cfg), store.balances, cfg)
+        assert updates == {"miner": 6, "v1": 0, "v2": 0}
+        block.finalize(["v1", "v2", "v3"], store.balances, cfg)
+        assert block.balances == {"miner": 6, "v1": 0, "v2": 0, "other": 3}
+
+
+def test_migrate_genesis_snapshots(tmp_path):
+    (tmp_path / "state.json").write_text(json.dumps({"state": {"counter": 0}}))
+    (tmp_path / "balances.json").write_text(json.dumps({"balances": {"alice": 1000}}))
+    store = migrate_json_snapshots(str(tmp_path / "state.json"), str(tmp_path / "balances.json"), str(tmp_path / "db.sqlite"))
+    store.close()
+    with SQLiteStateStore(str(tmp_path / "db.sqlite")) as reopened:
+        assert reopened.state["counter"] == 0
+        assert reopened.balances.get("alice") == 1000
+        assert len(reopened.balances) == 1
+
+
+def test_open_state_follows_backend(tmp_path):
+    (tmp_path / "state.json").write_text(json.dumps({"state": {"counter": 0}}))
+    (tmp_path / "balances.json").write_text(json.dumps({"balances": {"alice": 1000}}))
+    state, balances = open_state(Config(DATA_DIR=str(tmp_path)))
+    assert state == {"counter": 0} and balances == {"alice": 1000}
+    migrate_json_snapshots(str(tmp_path / "state.json"), str(tmp_path / "balances.json"),
+                           str(tmp_path / "state.sqlite")).close()
+    state, balances = open_state(Config(DATA_DIR=str(tmp_path), STATE_BACKEND="sqlite"))
+    assert state["counter"] == 0 and balances.copy() == {"alice": 1000}
+    state._db.close()
@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from blockchain_demo.block import Block
+from blockchain_demo.config import Config
+from blockchain_demo.sync import ChainSync, SyncError, load_progress
+from blockchain_demo.transaction import Transaction
+from blockchain_demo import wallet
+
+CFG = Config(DIFFICULTY_BITS=4, QUORUM_PERCENT=51)
+GENESIS = "00" * 32
+
+
+class ListSource:
+    def __init__(self, blocks, fail=False):
+        self.blocks_by_hash = {b["hash"]: b for b in blocks}
+        self.chain = blocks
+        self.fail = fail
+
+    def headers(self, start, count):
+        if self.fail:
+            raise ConnectionError("down")
+        return [{"hash": b["hash"], "header": b["header"]} for b in self.chain[start - 1:start - 1 + count]]
+
+    def blocks(self, hashes):
+        if self.fail:
+            raise ConnectionError("down")
+        return [self.blocks_by_hash[h] for h in hashes]
+
+
+def build_chain(tmp_path, length, forge_at=None):
+    user = wallet.generate_wallet(os.path.join(tmp_path, 'u.json'), local_role='user')
+    miner = wallet.generate_wallet(os.path.join(tmp_path, 'm.json'))
+    validators = [wallet.generate_wallet(os.path.join(tmp_path, f'v{i}.json'), local_role='validator') for i in range(3)]
+    validator_set = [v['public_key'] for v in validators]
+    genesis_balances = {user['public_key']: 100}
+    state, balances = {"x": 0}, genesis_balances
+    prev, blocks = GENESIS, []
+    for height in range(1, length + 1):
+        tx = Transaction(from_addr=user['public_key'], script=f'let x={height}', premium=1, nonce=height)
+        tx.sign(user)
+        block = Block.create_candidate(prev, height, miner['public_key'], [tx], state, balances)
+        if height == forge_at:
+            block.state = {"x": 999}
+        block.proof_of_work(CFG.DIFFICULTY_BITS)
+        for v in validators[:2]:
+            assert block.add_validator_signature(v['public_key'], wallet.sign(v, block.hash()), validator_set)
+        block.finalize(validator_set, balances, CFG)
+        blocks.append(block.to_json())
+        prev, state, balances = block.hash(), block.state, block.balances
+    return blocks, validator_set, genesis_balances
+
+
+def test_sync_validates_and_applies_in_order(tmp_path):
+    blocks, validator_set, balances = build_chain(tmp_path, 7)
+    applied, reports = [], []
+    progress_path = os.path.join(tmp_path, 'sync.json')
+    flaky, good = ListSource(blocks, fail=True), ListSource(blocks)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        sync = ChainSync([flaky, good], validator_set, CFG, on_block=applied.append, progress_path=progress_path,
+                         chunk_size=2, header_batch=3, executor=pool, progress=reports.append)
+        result = sync.run(GENESIS, 0, {"x": 0}, balances)
+    assert [b.header.height for b in applied] == list(range(1, 8))
+    assert applied[-1].state == {"x": 7}
+    assert result.height == 7 and result.tip_hash == blocks[-1]["hash"] and result.blocks == 7
+    assert result.blocks_per_sec > 0
+    assert reports[-1].height == 7
+    assert load_progress(progress_path) == (blocks[-1]["hash"], 7)
+
+
+def test_sync_resumes_from_saved_progress(tmp_path):
+    blocks, validator_set, balances = build_chain(tmp_path, 5)
+    progress_path = os.path.join(tmp_path, 'sync.json')
+    applied = {}
+    sync = ChainSync([ListSource(blocks)], validator_set, CFG, workers=1, chunk_size=2,
+                     on_block=lambda b: applied.__setitem__(b.hash(), b), progress_path=progress_path)
+    sync.run(GENESIS, 0, {"x": 0}, balances, target_height=3)
+    tip_hash, height = load_progress(progress_path)
+    assert height == 3
+    resumed = sync.run(tip_hash, height, applied[tip_hash].state, applied[tip_hash].balances)
+    assert resumed.height == 5 and resumed.blocks == 2
+
+
+def test_sync_rejects_block_failing_replay(tmp_path):
+    blocks, validator_set, balances = build_chain(tmp_path, 4, forge_at=3)
+    applied = []
+    sync = ChainSync([ListSource(blocks)], validator_set, CFG, workers=1, on_block=applied.append)
+    with pytest.raises(SyncError, match="state_post"):
+        sync.run(GENESIS, 0, {"x": 0}, balances)
+    assert [b.header.height for b in applied] == [1, 2]
+
+
+def test_sync_rejects_tampered_body(tmp_path):
+    blocks, validator_set, balances = build_chain(tmp_path, 2)
+    tampered = [dict(b) for b in blocks]
+    tampered[1]["balances"] = dict(tampered[1]["balances"], intruder=1)
+    source = ListSource(blocks)
+    source.blocks_by_hash = {b["hash"]: t for b, t in zip(blocks, tampered)}
+    sync = ChainSync([source], validator_set, CFG, workers=1)
+    with pytest.raises(SyncError, match="announced hash"):
+        sync.run(GENESIS, 0, {"x": 0}, balances)
@@ -0,0 +1,40 @@
+import os
+import dataclasses
+import json
+import pytest
+from blockchain_demo.transaction import Transaction
+from blockchain_demo import wallet
+
+
+def signed_tx(tmp_path):
+    w = wallet.generate_wallet(os.path.join(tmp_path, 'w.json'), local_role='user')
+    tx = Transaction(from_addr=w['public_key'], script='let a = "x"', premium=2, nonce=1)
+    tx.sign(w)
+    return w, tx
+
+
+def test_transaction_is_immutable_after_signing(tmp_path):
+    w, tx = signed_tx(tmp_path)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        tx.premium = 10
+    with pytest.raises(ValueError):
+        tx.sign(w)
+    assert tx.verify()
+    assert tx.hash() is tx.hash()
+
+
+def test_from_json_wire_fast_path(tmp_path):
+    _, tx = signed_tx(tmp_path)
+    raw = tx.wire_bytes()
+    parsed = Transaction.from_json(raw, canonical=True)
+    assert parsed == tx
+    assert parsed.wire_bytes() is raw
+    assert parsed.canonical_bytes() == tx.canonical_bytes()
+    assert parsed.hash() == tx.hash()
+    assert parsed.verify()
+    # untrusted bytes are parsed and serialized again only when needed
+    assert Transaction.from_json(raw).wire_bytes() is not raw
+    pretty = json.dumps(tx.to_json(), indent=2)
+    reparsed = Transaction.from_json(pretty)
+    assert reparsed.wire_bytes() == raw
+    assert reparsed.hash() == tx.hash()
@@ -0,0 +1,86 @@
+import os
+import json
+import threading
+from blockchain_demo.block import Block, BlockHeader
+from blockchain_demo.config import Config
+from blockchain_demo.transaction import Transaction
+from blockchain_demo.txindex import ExplorerIndex, canonical_blocks, main
+from blockchain_demo import config, wallet
+
+CFG = Config(QUORUM_PERCENT=51)
+GENESIS = "00" * 32
+
+
+def make_chain(tmp_path, length):
+    user = wallet.generate_wallet(os.path.join(tmp_path, 'u.json'), local_role='user')
+    validator = wallet.generate_wallet(os.path.join(tmp_path, 'v.json'), local_role='validator')
+    validator_set = [validator['public_key']]
+    state, balances = {"x": 0}, {user['public_key']: 100}
+    genesis = Block(BlockHeader(GENESIS, 0, 0, 0, "genesis"), [], state, balances, finalized=True)
+    prev, blocks = genesis.hash(), [genesis]
+    for height in range(1, length + 1):
+        txs = []
+        for i in range(2):
+            tx = Transaction(from_addr=user['public_key'], script=f'let x={height}', premium=1, nonce=2 * height + i)
+            tx.sign(user)
+            txs.append(tx)
+        block = Block.create_candidate(prev, height, "miner", txs, state, balances)
+        block.add_validator_signature(validator['public_key'], wallet.sign(validator, block.hash()), validator_set)
+        block.finalize(validator_set, balances, CFG)
+        blocks.append(block)
+        prev, state, balances = block.hash(), block.state, block.balances
+    return user['public_key'], validator['public_key'], blocks
+
+
+def test_connect_lookup_and_disconnect(tmp_path):
+    user, validator, blocks = make_chain(tmp_path, 3)
+    blocks = blocks[1:]
+    with ExplorerIndex(os.path.join(tmp_path, 'explorer.sqlite')) as index:
+        for block in blocks:
+            index.connect_block(block)
+        tx = blocks[1].transactions[1]
+        ref = index.tx(tx.hash())
+        assert (ref.block_hash, ref.height, ref.position) == (blocks[1].hash(), 2, 1)
+        refs = index.address_txs(user)
+        assert [r.tx_hash for r in refs] == [t.hash() for b in blocks for t in b.transactions]
+        page = index.address_txs(user, after=(refs[2].height, refs[2].position), limit=2)
+        assert page == refs[3:5]
+        assert [e.balance for e in index.balance_history(validator)] == [2, 4, 6]
+        assert [e.balance for e in index.balance_history("miner")] == [5, 10, 15]
+        # reorg unwinds the tip
+        index.disconnect_block(blocks[2].hash())
+        assert index.tx(blocks[2].transactions[0].hash()) is None
+        assert len(index.address_txs(user)) == 4
+        assert [e.height for e in index.balance_history("miner")] == [1, 2]
+
+
+def test_request_threads_share_a_bounded_pool(tmp_path):
+    user, _, blocks = make_chain(tmp_path, 2)
+    with ExplorerIndex(os.path.join(tmp_path, 'explorer.sqlite'), pool_size=2) as index:
+        for block in blocks[1:]:
+            index.connect_block(block)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(len(index.address_txs(user)))) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [4] * 20
+        assert index._pool.qsize() <= 2
+
+
+def test_reindex_from_blocks_dir(tmp_path, capsys, monkeypatch):
+    user, _, blocks = make_chain(tmp_path, 3)
+    blocks_dir = tmp_path / 'blocks'
+    blocks_dir.mkdir()
+    for block in blocks:
+        (blocks_dir / f'{block.hash()}.json').write_text(json.dumps(block.to_json()))
+    assert [b.hash() for b in canonical_blocks(str(blocks_dir))] == [b.hash() for b in blocks]
+    # defaults come from the loaded config: BLOCKS_DIR and EXPLORER_INDEX_FILE under DATA_DIR
+    monkeypatch.setattr(config, "CFG", Config(DATA_DIR=str(tmp_path), BLOCKS_DIR=str(blocks_dir),
+                                              EXPLORER_INDEX_FILE='idx.sqlite'))
+    main([])
+    db_path = os.path.join(tmp_path, 'idx.sqlite')
+    assert "indexed 4 blocks" in capsys.readouterr().out
+    with ExplorerIndex(db_path) as index:
+        assert len(index.address_txs(user)) == 6
@@ -0,0 +1,109 @@
+import os
+import pytest
+from blockchain_demo.block import Block
+from blockchain_demo.config import Config
+from blockchain_demo.deltas import DeltaStore
+from blockchain_demo.transaction import Transaction
+from blockchain_demo.validation import Layer, ValidationEngine, ValidationError
+from blockchain_demo import wallet
+
+CFG = Config(QUORUM_PERCENT=51)
+GENESIS = "00" * 32
+
+
+@pytest.fixture
+def actors(tmp_path):
+    user = wallet.generate_wallet(os.path.join(tmp_path, 'u.json'), local_role='user')
+    validator = wallet.generate_wallet(os.path.join(tmp_path, 'v.json'), local_role='validator')
+    return user, validator
+
+
+def next_block(actors, prev, height, script, state, balances):
+    user, validator = actors
+    tx = Transaction(from_addr=user['public_key'], script=script, premium=2, nonce=height)
+    tx.sign(user)
+    block = Block.create_candidate(prev, height, "miner", [tx], dict(state), dict(balances))
+    block.add_validator_signature(validator['public_key'], wallet.sign(validator, block.hash()), [validator['public_key']])
+    return block.finalize([validator['public_key']], dict(balances), CFG)
+
+
+def test_layer_shares_parent_and_flattens():
+    base = {"a": 1, "b": 2}
+    left = Layer(base, {"a": 10})
+    right = Layer(base, {"c": 3})
+    assert dict(left) == {"a": 10, "b": 2} and len(left) == 2
+    assert dict(right) == {"a": 1, "b": 2, "c": 3} and len(right) == 3
+    layer = right
+    for i in range(5):
+        layer = Layer(layer, {"a": i}, max_depth=3)
+    assert layer.depth <= 3
+    assert dict(layer) == {"a": 4, "b": 2, "c": 3}
+
+
+def test_validates_chain_and_forks_from_cache(actors):
+    genesis_state, genesis_balances = {"x": 0, "y": 1}, {actors[0]['public_key']: 50}
+    engine = ValidationEngine(CFG)
+    engine.add(GENESIS, genesis_state, genesis_balances)
+    b1 = next_block(actors, GENESIS, 1, 'let x=1', genesis_state, genesis_balances)
+    state, balances = engine.validate(b1)
+    assert dict(state) == b1.state and dict(balances) == b1.balances
+    # two siblings on top of b1 both validate against the shared parent layer
+    b2a = next_block(actors, b1.hash(), 2, 'let x=x+1', b1.state, b1.balances)
+    b2b = next_block(actors, b1.hash(), 2, 'let z=7', b1.state, b1.balances)
+    assert dict(engine.validate(b2a)[0]) == {"x": 2, "y": 1}
+    assert dict(engine.validate(b2b)[0]) == {"x": 1, "y": 1, "z": 7}
+    assert engine.stats() == {"hits": 3, "misses": 0, "size": 4}
+
+
+def test_rejects_wrong_declared_state(actors):
+    genesis_state, genesis_balances = {"x": 0}, {}
+    engine = ValidationEngine(CFG)
+    engine.add(GENESIS, genesis_state, genesis_balances)
+    block = next_block(actors, GENESIS, 1, 'let x=5', genesis_state, genesis_balances)
+    block.state = {"x": 6}
+    with pytest.raises(ValidationError, match=r"state\[x\]"):
+        engine.validate(block)
+    block.state = {"x": 5, "extra": 1}
+    with pytest.raises(ValidationError, match="keys"):
+        engine.validate(block)
+    block.state = {"x": 5}
+    block.balances = dict(block.balances, miner=0)
+    with pytest.raises(ValidationError, match=r"balances\[miner\]"):
+        engine.validate(block)
+
+
+def test_default_check_catches_untouched_changes(actors):
+    user = actors[0]['public_key']
+    genesis_state, genesis_balances = {"x": 0, "treasury": 1000}, {user: 50}
+    engine = ValidationEngine(CFG)
+    engine.add(GENESIS, genesis_state, genesis_balances)
+    block = next_block(actors, GENESIS, 1, 'let x=5', genesis_state, genesis_balances)
+    # same key counts, only untouched keys forged
+    block.state = {"x": 5, "treasury": 0}
+    with pytest.raises(ValidationError, match="without being written"):
+        engine.validate(block)
+    block.state = {"x": 5, "treasury": 1000}
+    block.balances = dict(block.balances, **{user: 10 ** 9})
+    with pytest.raises(ValidationError, match="without being written"):
+        engine.validate(block)
+    # the trusted fast path only looks at written keys and sizes
+    block.balances = dict(block.balances, **{user: 50})
+    block.state = {"x": 5, "treasury": 0}
+    trusted = ValidationEngine(CFG, full_check=False)
+    trusted.add(GENESIS, genesis_state, genesis_balances)
+    trusted.validate(block)
+
+
+def test_cache_miss_falls_back_to_loader(actors):
+    genesis_state, genesis_balances = {"x": 0}, {}
+    store = DeltaStore(checkpoint_interval=10)
+    b1 = next_block(actors, GENESIS, 1, 'let x=1', genesis_state, genesis_balances)
+    store.put(GENESIS, None, 0, {"set": {}, "del": []}, {"set": {}, "del": []}, genesis_state, genesis_balances)
+    store.put_block(b1.to_json(), genesis_state, genesis_balances)
+    engine = ValidationEngine(CFG, loader=store.get, max_entries=1)
+    b2 = next_block(actors, b1.hash(), 2, 'let x=x+1', b1.state, b1.balances)
+    assert dict(engine.validate(b2)[0]) == {"x": 2}
+    assert engine.stats()["misses"] == 1
+    orphan = next_block(actors, "ff" * 32, 3, 'let x=1', genesis_state, genesis_balances)
+    with pytest.raises(ValidationError, match="unknown parent"):
+        engine.validate(orphan)
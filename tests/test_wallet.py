@@ -0,0 +1,34 @@
+import os
+from blockchain_demo import wallet
+from blockchain_demo.transaction import Transaction
+
+
+def create_wallet(tmp_path, name='w.json'):
+    return wallet.generate_wallet(os.path.join(tmp_path, name), local_role='user')
+
+
+def test_verifying_key_cache_hits(tmp_path):
+    w = create_wallet(tmp_path)
+    wallet.clear_key_caches()
+    sig = wallet.sign(w, "hello")
+    for _ in range(3):
+        assert wallet.verify(w['public_key'], "hello", sig)
+    assert not wallet.verify(w['public_key'], "other", sig)
+    stats = wallet.key_cache_stats()
+    assert stats["verifying"]["misses"] == 1
+    assert stats["verifying"]["hits"] == 3
+    assert stats["verifying"]["hit_rate"] == 0.75
+    assert stats["signing"]["size"] == 1
+
+
+def test_verify_rejects_malformed_pubkey():
+    assert wallet.verify("zz", "hello", "00") is False
+
+
+def test_wallet_object_signs_transactions(tmp_path):
+    data = create_wallet(tmp_path)
+    w = wallet.Wallet.load(os.path.join(tmp_path, 'w.json'))
+    assert w.public_key == data['public_key']
+    tx = Transaction(from_addr=w.public_key, script='let a=1', premium=1, nonce=1)
+    tx.sign(w)
+    assert tx.verify()